@@ -0,0 +1,110 @@
+"""
+Benchmark of loading bars from sqlite database into list of BarData by
+load_bar_data, compared with columnar BarBatch by load_bar_array.
+
+Database is created in a temporary trader folder, so that the database
+of current user is not touched.
+
+Usage:
+    python -m benchmarks.load_benchmark [count]
+
+Run from root folder of repository.
+"""
+
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from operator import attrgetter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Tuple
+
+
+PRICE_FIELDS = ("open_price", "high_price", "low_price", "close_price")
+
+
+def measure(func: Callable) -> Tuple[float, float, object]:
+    """
+    Get seconds of one run, peak MB allocated of another run, and result.
+    """
+    start = perf_counter()
+    result = func()
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak / 1024 / 1024, result
+
+
+def run(count: int) -> None:
+    """"""
+    # Trader folder is decided when vnpy.trader is first imported
+    from vnpy.trader.constant import Exchange, Interval
+    from vnpy.trader.object import BarData
+    from vnpy.trader.database import DB_TZ
+    from vnpy.database.sqlite.sqlite_database import database_manager, db
+
+    start = DB_TZ.localize(datetime(2020, 1, 1))
+    end = start + timedelta(minutes=count)
+
+    bars = [
+        BarData(
+            symbol="rb2101",
+            exchange=Exchange.SHFE,
+            interval=Interval.MINUTE,
+            datetime=start + timedelta(minutes=i),
+            volume=i,
+            open_interest=i,
+            open_price=4000 + i % 100,
+            high_price=4010 + i % 100,
+            low_price=3990 + i % 100,
+            close_price=4000 + i % 100,
+            gateway_name="DB"
+        )
+        for i in range(count)
+    ]
+    database_manager.save_bar_data(bars)
+    del bars
+
+    args = ("rb2101", Exchange.SHFE, Interval.MINUTE, start, end)
+
+    print(f"{count} bars from sqlite, warm cache")
+    database_manager.load_bar_array(*args)
+
+    elapsed, peak, bars = measure(lambda: database_manager.load_bar_data(*args))
+    print(f"{'load_bar_data':16s}{elapsed:8.2f} s{peak:10.0f} MB peak")
+
+    elapsed, peak, batch = measure(lambda: database_manager.load_bar_array(*args))
+    print(f"{'load_bar_array':16s}{elapsed:8.2f} s{peak:10.0f} MB peak")
+
+    # Sqlite driver returns model objects with fields of BarData
+    get_values = attrgetter("datetime", "volume", "open_interest", *PRICE_FIELDS)
+    same = [get_values(bar) for bar in batch.to_bars()] == [get_values(bar) for bar in bars]
+    print(f"Same result: {same}")
+
+    db.close()
+
+
+def main() -> None:
+    """"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 525_600
+
+    cwd = os.getcwd()
+
+    with TemporaryDirectory() as temp_dir:
+        Path(temp_dir).joinpath(".vntrader").mkdir()
+        os.chdir(temp_dir)
+
+        try:
+            run(count)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of memory allocated per tick by Event with TickData, compared
+with Event with CompactTickData.
+
+Usage:
+    python -m benchmarks.object_benchmark [count]
+
+Run from root folder of repository.
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from typing import List
+
+from vnpy.event import Event
+from vnpy.trader.constant import Exchange
+from vnpy.trader.event import EVENT_TICK
+from vnpy.trader.object import TickData, CompactTickData
+
+
+def create_tick(cls: type, i: int, dt: datetime) -> TickData:
+    """
+    Create tick with fields filled as gateway does.
+    """
+    return cls(
+        symbol="btcusdt",
+        exchange=Exchange.BINANCE,
+        datetime=dt,
+        name="btcusdt",
+        volume=1000 + i,
+        last_price=30000 + i * 0.01,
+        bid_price_1=30000 + i * 0.01,
+        ask_price_1=30000 + i * 0.01 + 0.01,
+        bid_volume_1=1,
+        ask_volume_1=1,
+        gateway_name="BINANCE",
+    )
+
+
+def measure(cls: type, count: int) -> dict:
+    """
+    Measure blocks and bytes still allocated per Event and tick pair,
+    which is what event queue holds for each pending tick.
+    """
+    # Datetime objects are created before measuring, as they are the
+    # same for both classes.
+    dts = [datetime(2021, 1, 4, 9, 0, i % 60, i % 1000) for i in range(count)]
+    events: List[Event] = []
+
+    # Warm up cache of vt_symbol
+    create_tick(cls, 0, dts[0])
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = perf_counter()
+
+    for i in range(count):
+        tick = create_tick(cls, i, dts[i])
+        events.append(Event(EVENT_TICK, tick))
+
+    elapsed = perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+
+    # Exclude list holding events
+    size -= sys.getsizeof(events)
+    blocks -= 1
+
+    return {
+        "blocks": blocks / count,
+        "bytes": size / count,
+        "us": elapsed / count * 1_000_000,
+    }
+
+
+def main() -> None:
+    """"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    print(f"{count} ticks, per Event + tick (time includes tracemalloc overhead)")
+    for cls in (TickData, CompactTickData):
+        result = measure(cls, count)
+        print(
+            f"{cls.__name__:16s}"
+            f"{result['blocks']:8.1f} blocks"
+            f"{result['bytes']:10.0f} bytes"
+            f"{result['us']:10.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark of bulk writing bars into sqlite database, saved by calls of
+save_bar_data with size rows each, until table has count rows. Then a
+small save as done by data recorder is timed with the full table.
+
+Database is created in a temporary trader folder, so that the database
+of current user is not touched, with WAL journal of database.sqlite_wal
+enabled.
+
+Usage:
+    python -m benchmarks.write_benchmark [count] [size]
+
+Run from root folder of repository.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import List
+
+
+def run(count: int, size: int) -> None:
+    """"""
+    # Trader folder is decided when vnpy.trader is first imported
+    from vnpy.trader.constant import Exchange, Interval
+    from vnpy.trader.object import BarData
+    from vnpy.trader.setting import SETTINGS
+
+    # Database driver is created when vnpy.trader.database is imported
+    SETTINGS["database.sqlite_wal"] = True
+
+    from vnpy.trader.database import DB_TZ
+    from vnpy.database.sqlite.sqlite_database import (
+        database_manager,
+        db,
+        DbBarData,
+        DbBarOverview
+    )
+
+    start = DB_TZ.localize(datetime(2000, 1, 1))
+
+    def create_bars(first: int, last: int) -> List[BarData]:
+        """"""
+        return [
+            BarData(
+                symbol="rb2101",
+                exchange=Exchange.SHFE,
+                interval=Interval.MINUTE,
+                datetime=start + timedelta(minutes=i),
+                volume=i,
+                open_interest=i,
+                open_price=4000 + i % 100,
+                high_price=4010 + i % 100,
+                low_price=3990 + i % 100,
+                close_price=4000 + i % 100,
+                gateway_name="DB"
+            )
+            for i in range(first, last)
+        ]
+
+    journal_mode = db.execute_sql("PRAGMA journal_mode").fetchone()[0]
+    print(f"{count} bars into sqlite ({journal_mode} journal), {size} bars each save")
+    total = 0
+
+    for first in range(0, count, size):
+        last = min(first + size, count)
+        bars = create_bars(first, last)
+
+        t = perf_counter()
+        database_manager.save_bar_data(bars)
+        elapsed = perf_counter() - t
+        total += elapsed
+
+        print(f"{last:12d} rows{elapsed:8.2f} s{len(bars) / elapsed:10.0f} rows/s")
+
+    print(f"Total {total:.1f} s, {count / total:.0f} rows/s")
+
+    bars = create_bars(count, count + 1000)
+    t = perf_counter()
+    database_manager.save_bar_data(bars)
+    print(f"Save 1000 bars into full table {perf_counter() - t:.3f} s")
+
+    overview = DbBarOverview.get()
+    print(f"Overview count {overview.count}, table count {DbBarData.select().count()}")
+
+    db.close()
+
+
+def main() -> None:
+    """"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    cwd = os.getcwd()
+
+    with TemporaryDirectory() as temp_dir:
+        Path(temp_dir).joinpath(".vntrader").mkdir()
+        os.chdir(temp_dir)
+
+        try:
+            run(count, size)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
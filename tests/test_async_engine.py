@@ -0,0 +1,45 @@
+"""
+Check event dispatching of AsyncEventEngine.
+"""
+
+from threading import Event as ThreadEvent
+
+from vnpy.event import Event
+from vnpy.event.async_engine import AsyncEventEngine
+
+
+def test_handler_exception() -> None:
+    """
+    Exception of one handler should not stop processing of events.
+    """
+    engine = AsyncEventEngine()
+    errors = []
+    engine.loop.set_exception_handler(lambda loop, context: errors.append(context["exception"]))
+
+    received = []
+    done = ThreadEvent()
+
+    def bad_handler(event: Event) -> None:
+        raise ValueError(event.data)
+
+    async def bad_coroutine(event: Event) -> None:
+        raise KeyError(event.data)
+
+    def handler(event: Event) -> None:
+        received.append(event.data)
+        if event.data == 2:
+            done.set()
+
+    engine.register("eTest", bad_handler)
+    engine.register("eTest", bad_coroutine)
+    engine.register("eTest", handler)
+    engine.start()
+
+    for i in range(3):
+        engine.put(Event("eTest", i))
+
+    assert done.wait(5)
+    engine.stop()
+
+    assert received == [0, 1, 2]
+    assert len(errors) == 6
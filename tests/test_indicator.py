@@ -0,0 +1,161 @@
+"""
+Check incremental indicators against talib over the whole history.
+"""
+
+import numpy as np
+import pytest
+import talib
+
+from vnpy.trader.indicator import (
+    SmaIndicator,
+    EmaIndicator,
+    RsiIndicator,
+    AtrIndicator,
+    BollIndicator,
+    MacdIndicator,
+    DonchianIndicator,
+    KamaIndicator
+)
+
+
+def create_random_bars(count: int = 3000, seed: int = 0) -> tuple:
+    """
+    Random walk bars with a flat section in the middle.
+    """
+    rng = np.random.default_rng(seed)
+
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    close[count // 2:count // 2 + 100] = close[count // 2]
+
+    high = close + rng.uniform(0, 1, count)
+    low = close - rng.uniform(0, 1, count)
+    return high, low, close
+
+
+def create_tick_bars(count: int = 60000, seed: int = 1) -> tuple:
+    """
+    High price moving by 0.01 ticks, where variance from running sum of
+    squares cancels badly.
+    """
+    rng = np.random.default_rng(seed)
+
+    close = np.round(30000 + np.cumsum(rng.choice([-0.01, 0, 0.01], count)), 2)
+    high = close + 0.01
+    low = close - 0.01
+    return high, low, close
+
+
+DATA = {
+    "random": create_random_bars(),
+    "tick": create_tick_bars(),
+}
+
+
+def run(indicator, values: tuple, attrs: list) -> list:
+    """
+    Update all values into indicator and collect attributes after each.
+    """
+    results = [[] for _ in attrs]
+
+    for args in zip(*values):
+        indicator.update(*args)
+
+        for result, attr in zip(results, attrs):
+            result.append(getattr(indicator, attr))
+
+    return [np.array(r) for r in results]
+
+
+def assert_close(actual: np.ndarray, expected: np.ndarray, rtol: float = 1e-9) -> None:
+    """"""
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("name", DATA)
+@pytest.mark.parametrize("n", [5, 20])
+def test_sma_ema_kama(name: str, n: int) -> None:
+    """"""
+    high, low, close = DATA[name]
+
+    value, = run(SmaIndicator(n), (close,), ["value"])
+    assert_close(value, talib.SMA(close, n))
+
+    value, = run(EmaIndicator(n), (close,), ["value"])
+    assert_close(value, talib.EMA(close, n))
+
+    value, = run(KamaIndicator(n), (close,), ["value"])
+    assert_close(value, talib.KAMA(close, n))
+
+
+@pytest.mark.parametrize("name", DATA)
+@pytest.mark.parametrize("n", [6, 14])
+def test_rsi_atr(name: str, n: int) -> None:
+    """"""
+    high, low, close = DATA[name]
+
+    value, = run(RsiIndicator(n), (close,), ["value"])
+    assert_close(value, talib.RSI(close, n), 1e-7)
+
+    value, = run(AtrIndicator(n), (high, low, close), ["value"])
+    assert_close(value, talib.ATR(high, low, close, n), 1e-7)
+
+
+@pytest.mark.parametrize("name", DATA)
+def test_boll(name: str) -> None:
+    """"""
+    high, low, close = DATA[name]
+
+    up, mid, down = run(BollIndicator(20, 2), (close,), ["up", "mid", "down"])
+    talib_up, talib_mid, talib_down = talib.BBANDS(close, 20, 2, 2)
+
+    assert_close(mid, talib_mid)
+    assert_close(up, talib_up)
+    assert_close(down, talib_down)
+
+    # Band width is small compared with price for tick data, so check it
+    # separately against exact standard deviation.
+    windows = np.lib.stride_tricks.sliding_window_view(close, 20)
+    width = np.full(len(close), np.nan)
+    width[19:] = windows.std(axis=1) * 2
+
+    assert_close(up - mid, width, 1e-6)
+
+
+def test_boll_long_run() -> None:
+    """
+    Band width should not drift away from talib over long history.
+    """
+    high, low, close = create_tick_bars(300_000, seed=3)
+
+    up, mid, down = run(BollIndicator(20, 2), (close,), ["up", "mid", "down"])
+    talib_up, talib_mid, talib_down = talib.BBANDS(close, 20, 2, 2)
+
+    assert_close(mid, talib_mid)
+    assert_close(up - mid, talib_up - talib_mid, 1e-8)
+    assert_close(mid - down, talib_mid - talib_down, 1e-8)
+
+
+@pytest.mark.parametrize("name", DATA)
+def test_macd(name: str) -> None:
+    """"""
+    high, low, close = DATA[name]
+
+    macd, signal, hist = run(
+        MacdIndicator(12, 26, 9), (close,), ["macd", "signal", "hist"]
+    )
+    talib_macd, talib_signal, talib_hist = talib.MACD(close, 12, 26, 9)
+
+    assert_close(macd, talib_macd, 1e-7)
+    assert_close(signal, talib_signal, 1e-7)
+    assert_close(hist, talib_hist, 1e-6)
+
+
+@pytest.mark.parametrize("name", DATA)
+def test_donchian(name: str) -> None:
+    """"""
+    high, low, close = DATA[name]
+
+    up, down = run(DonchianIndicator(20), (high, low), ["up", "down"])
+
+    assert_close(up, talib.MAX(high, 20))
+    assert_close(down, talib.MIN(low, 20))
@@ -0,0 +1,75 @@
+"""
+Check recording and replaying of event journal files.
+"""
+
+from pathlib import Path
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.journal import EventJournal, JournalReplayer, get_journal_files
+
+
+def record(folder_path: Path, count: int, **kwargs) -> None:
+    """
+    Record count events into journal folder.
+    """
+    journal = EventJournal(None, EventEngine(), str(folder_path), **kwargs)
+
+    for i in range(count):
+        journal.process_event(Event("eTest", {"i": i, "data": "x" * 100}))
+
+    journal.close()
+
+
+def test_replay(tmp_path: Path) -> None:
+    """"""
+    record(tmp_path, 10)
+
+    replayer = JournalReplayer(str(tmp_path))
+    events = [event for _, event in replayer.load()]
+
+    assert [event.data["i"] for event in events] == list(range(10))
+    assert not replayer.truncated
+
+
+def test_truncated_record(tmp_path: Path) -> None:
+    """
+    Record partly written by crash should stop reading of the file.
+    """
+    record(tmp_path, 10)
+
+    file_path = get_journal_files(tmp_path)[0]
+    size = file_path.stat().st_size
+
+    with open(file_path, "r+b") as f:
+        f.truncate(size - 20)
+
+    replayer = JournalReplayer(str(tmp_path))
+    events = [event for _, event in replayer.load()]
+
+    assert [event.data["i"] for event in events] == list(range(9))
+
+    path, offset = replayer.truncated[0]
+    assert path == file_path
+    assert offset < size - 20
+
+    # Unused space after crash is zero, so that payload of last record
+    # cannot be decoded
+    with open(file_path, "r+b") as f:
+        f.truncate(size + 1000)
+
+    replayer = JournalReplayer(str(tmp_path))
+    events = [event for _, event in replayer.load()]
+
+    assert len(events) == 9
+    assert replayer.truncated == [(file_path, offset)]
+
+
+def test_keep_all_files(tmp_path: Path) -> None:
+    """
+    All files are kept if max_files is 0.
+    """
+    record(tmp_path, 5, file_size=64, max_files=0)
+    assert len(get_journal_files(tmp_path)) == 5
+
+    record(tmp_path.joinpath("limited"), 5, file_size=64, max_files=2)
+    assert len(get_journal_files(tmp_path.joinpath("limited"))) == 2
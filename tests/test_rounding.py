@@ -0,0 +1,113 @@
+"""
+Check fast tick rounding against the Decimal based implementations it
+replaces.
+"""
+
+from decimal import Decimal
+from math import ceil, floor
+
+import numpy as np
+import pytest
+
+from vnpy.trader.constant import Exchange, Product
+from vnpy.trader.object import ContractData
+from vnpy.trader.rounding import ContractRounder, TickRounder
+from vnpy.trader.utility import round_to, floor_to, ceil_to
+
+
+TICKS = [
+    1e-8, 1e-6, 0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.02, 0.05,
+    0.1, 0.2, 0.25, 0.5, 1, 2, 5, 10, 100
+]
+
+
+def decimal_round_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(round(value / target)) * target)
+
+
+def decimal_floor_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(floor(value / target)) * target)
+
+
+def decimal_ceil_to(value: float, target: float) -> float:
+    """"""
+    value = Decimal(str(value))
+    target = Decimal(str(target))
+    return float(int(ceil(value / target)) * target)
+
+
+def create_values(tick: float, count: int = 2000, seed: int = 0) -> np.ndarray:
+    """
+    Random values around exact and half multiples of tick, with random
+    precision, large magnitude and negative sign.
+    """
+    rng = np.random.default_rng(seed)
+
+    n = rng.integers(-10 ** 6, 10 ** 6, count)
+    exact = n * tick
+    half = (n + 0.5) * tick
+
+    digits = rng.integers(0, 10, count)
+    rounded = np.array([round(v, int(d)) for v, d in zip(rng.uniform(-1e4, 1e4, count), digits)])
+
+    large = rng.uniform(-1e15, 1e15, count // 10)
+    noisy = exact + rng.normal(0, tick * 1e-6, count)
+
+    return np.concatenate([exact, half, rounded, large, noisy])
+
+
+@pytest.mark.parametrize("tick", TICKS)
+def test_scalar(tick: float) -> None:
+    """"""
+    rounder = TickRounder(tick)
+
+    for value in create_values(tick).tolist():
+        assert rounder.round(value) == decimal_round_to(value, tick), value
+        assert rounder.floor(value) == decimal_floor_to(value, tick), value
+        assert rounder.ceil(value) == decimal_ceil_to(value, tick), value
+
+        assert round_to(value, tick) == decimal_round_to(value, tick), value
+        assert floor_to(value, tick) == decimal_floor_to(value, tick), value
+        assert ceil_to(value, tick) == decimal_ceil_to(value, tick), value
+
+
+@pytest.mark.parametrize("tick", TICKS)
+def test_array(tick: float) -> None:
+    """"""
+    rounder = TickRounder(tick)
+    values = create_values(tick, seed=1)
+
+    expected = [decimal_round_to(v, tick) for v in values.tolist()]
+    np.testing.assert_array_equal(rounder.round_array(values), expected)
+
+    expected = [decimal_floor_to(v, tick) for v in values.tolist()]
+    np.testing.assert_array_equal(rounder.floor_array(values), expected)
+
+    expected = [decimal_ceil_to(v, tick) for v in values.tolist()]
+    np.testing.assert_array_equal(rounder.ceil_array(values), expected)
+
+
+@pytest.mark.parametrize("tick", [0.2, 0.5, 1])
+def test_contract(tick: float) -> None:
+    """"""
+    contract = ContractData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        name="rb2101",
+        product=Product.FUTURES,
+        size=10,
+        pricetick=tick,
+        min_volume=tick,
+        gateway_name="TEST"
+    )
+    rounder = ContractRounder(contract)
+
+    for value in create_values(tick, 1000, seed=2).tolist():
+        assert rounder.round_price(value) == decimal_round_to(value, tick), value
+        assert rounder.round_volume(value) == decimal_floor_to(value, tick), value
@@ -0,0 +1,47 @@
+"""
+Check expiry of timers in hierarchical timer wheel.
+"""
+
+import pytest
+
+from vnpy.event import timer
+from vnpy.event.timer import Timer, TimerWheel
+
+
+def run(wheel: TimerWheel, ticks: int) -> dict:
+    """
+    Advance wheel by ticks, and get tick when each timer expired.
+    """
+    result = {}
+    for _ in range(ticks):
+        for t in wheel.advance():
+            result[t.timer_id] = wheel.now
+    return result
+
+
+def test_expire() -> None:
+    """"""
+    wheel = TimerWheel()
+
+    expires = [1, 2, 63, 64, 65, 1000, 4095, 4096, 5000, 300000]
+    for n in expires:
+        wheel.add(Timer(str(n), n, None), n)
+
+    result = run(wheel, 300001)
+    assert result == {str(n): n for n in expires}
+
+
+@pytest.mark.parametrize("delay", [99, 100, 101, 250, 1000])
+def test_beyond_max_delay(monkeypatch, delay: int) -> None:
+    """
+    Timer beyond range of wheel should not expire early.
+    """
+    monkeypatch.setattr(timer, "MAX_DELAY", 100)
+
+    wheel = TimerWheel()
+    run(wheel, 37)
+
+    wheel.add(Timer("t", delay, None), wheel.now + delay)
+
+    result = run(wheel, 1100)
+    assert result == {"t": 37 + delay}
@@ -5,6 +5,7 @@ from threading import Thread
 from queue import Queue, Empty
 from copy import copy
 from collections import defaultdict
+from typing import List
 
 from vnpy.event import Event, EventEngine
 from vnpy.trader.engine import BaseEngine, MainEngine
@@ -15,9 +16,10 @@ from vnpy.trader.object import (
     BarData,
     ContractData
 )
-from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT, EVENT_TIMER
+from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
 from vnpy.trader.utility import load_json, save_json, BarGenerator
 from vnpy.trader.database import database_manager
+from vnpy.trader.cache import data_cache
 from vnpy.app.spread_trading.base import EVENT_SPREAD_DATA, SpreadData
 
 
@@ -44,7 +46,6 @@ class RecorderEngine(BaseEngine):
         self.bar_recordings = {}
         self.bar_generators = {}
 
-        self.timer_count = 0
         self.timer_interval = 10
 
         self.ticks = defaultdict(list)
@@ -78,8 +79,10 @@ class RecorderEngine(BaseEngine):
 
                 if task_type == "tick":
                     database_manager.save_tick_data(data)
+                    data_cache.invalidate(data[0].vt_symbol)
                 elif task_type == "bar":
                     database_manager.save_bar_data(data)
+                    data_cache.invalidate(data[0].vt_symbol, data[0].interval)
 
             except Empty:
                 continue
@@ -185,8 +188,8 @@ class RecorderEngine(BaseEngine):
 
     def register_event(self):
         """"""
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
-        self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        self.event_engine.add_timer(self.timer_interval, self.process_timer_event)
+        self.event_engine.register_batch(EVENT_TICK, self.process_tick_events)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_SPREAD_DATA, self.process_spread_event)
 
@@ -201,11 +204,6 @@ class RecorderEngine(BaseEngine):
 
     def process_timer_event(self, event: Event):
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_interval:
-            return
-        self.timer_count = 0
-
         for bars in self.bars.values():
             self.queue.put(("bar", bars))
         self.bars.clear()
@@ -214,10 +212,10 @@ class RecorderEngine(BaseEngine):
             self.queue.put(("tick", ticks))
         self.ticks.clear()
 
-    def process_tick_event(self, event: Event):
+    def process_tick_events(self, events: List[Event]):
         """"""
-        tick = event.data
-        self.update_tick(tick)
+        for event in events:
+            self.update_tick(event.data)
 
     def process_contract_event(self, event: Event):
         """"""
@@ -61,8 +61,8 @@ class OptionEngine(BaseEngine):
         self.instruments: Dict[str, InstrumentData] = {}
         self.active_portfolios: Dict[str, PortfolioData] = {}
 
-        self.timer_count: int = 0
         self.timer_trigger: int = 60
+        self.timer_id: str = ""
 
         self.offset_converter: OffsetConverter = OffsetConverter(main_engine)
         self.get_position_holding = self.offset_converter.get_position_holding
@@ -156,7 +156,10 @@ class OptionEngine(BaseEngine):
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
         self.event_engine.register(EVENT_POSITION, self.process_position_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_trigger, self.process_timer_event
+        )
 
     def process_tick_event(self, event: Event) -> None:
         """"""
@@ -212,11 +215,6 @@ class OptionEngine(BaseEngine):
 
     def process_timer_event(self, event: Event) -> None:
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_trigger:
-            return
-        self.timer_count = 0
-
         for portfolio in self.active_portfolios.values():
             portfolio.calculate_atm_price()
 
@@ -357,6 +355,11 @@ class OptionEngine(BaseEngine):
         """"""
         self.timer_trigger = timer_trigger
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_trigger, self.process_timer_event
+        )
+
 
 class OptionHedgeEngine:
     """"""
@@ -377,14 +380,13 @@ class OptionHedgeEngine:
 
         self.active: bool = False
         self.active_orderids: Set[str] = set()
-        self.timer_count = 0
+        self.timer_id: str = ""
 
         self.register_event()
 
     def register_event(self) -> None:
         """"""
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
 
     def process_order_event(self, event: Event) -> None:
         """"""
@@ -401,11 +403,6 @@ class OptionHedgeEngine:
         if not self.active:
             return
 
-        self.timer_count += 1
-        if self.timer_count < self.timer_trigger:
-            return
-        self.timer_count = 0
-
         self.run()
 
     def start(
@@ -430,13 +427,19 @@ class OptionHedgeEngine:
 
         self.active = True
 
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_trigger, self.process_timer_event
+        )
+
     def stop(self) -> None:
         """"""
         if not self.active:
             return
 
         self.active = False
-        self.timer_count = 0
+
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = ""
 
     def run(self) -> None:
         """"""
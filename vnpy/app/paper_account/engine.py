@@ -17,8 +17,7 @@ from vnpy.trader.event import (
     EVENT_TICK,
     EVENT_POSITION,
     EVENT_CONTRACT,
-    EVENT_LOG,
-    EVENT_TIMER
+    EVENT_LOG
 )
 from vnpy.trader.constant import (
     Status,
@@ -47,7 +46,7 @@ class PaperEngine(BaseEngine):
         self.instant_trade: bool = False
 
         self.order_count: int = 100000
-        self.timer_count: int = 0
+        self.timer_id: str = ""
 
         self.active_orders: Dict[str, Dict[str, OrderData]] = {}
         self.gateway_map: Dict[str, str] = {}
@@ -71,7 +70,9 @@ class PaperEngine(BaseEngine):
         """"""
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_interval, self.process_timer_event
+        )
 
     def process_contract_event(self, event: Event) -> None:
         """"""
@@ -107,11 +108,6 @@ class PaperEngine(BaseEngine):
 
     def process_timer_event(self, event: Event) -> None:
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_interval:
-            return
-        self.timer_count = 0
-
         for position in self.positions.values():
             contract = self.main_engine.get_contract(position.vt_symbol)
             if contract:
@@ -479,6 +475,11 @@ class PaperEngine(BaseEngine):
         self.timer_interval = timer_interval
         self.save_setting()
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_interval, self.process_timer_event
+        )
+
     def set_instant_trade(self, instant_trade: bool) -> None:
         """"""
         self.instant_trade = bool(instant_trade)
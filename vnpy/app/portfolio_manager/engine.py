@@ -10,7 +10,6 @@ from vnpy.trader.engine import (
 from vnpy.trader.event import (
     EVENT_ORDER,
     EVENT_CONTRACT,
-    EVENT_TIMER,
     EVENT_TRADE
 )
 from vnpy.trader.object import ContractData, OrderData, TradeData, SubscribeRequest
@@ -45,8 +44,8 @@ class PortfolioEngine(BaseEngine):
         self.contract_results: Dict[str, ContractResult] = {}
         self.portfolio_results: Dict[str, PortfolioResult] = {}
 
-        self.timer_count: int = 0
         self.timer_interval: int = 5
+        self.timer_id: str = ""
 
         self.load_setting()
         self.load_data()
@@ -57,7 +56,9 @@ class PortfolioEngine(BaseEngine):
         """"""
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_interval, self.process_timer_event
+        )
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
 
     def process_order_event(self, event: Event) -> None:
@@ -104,11 +105,6 @@ class PortfolioEngine(BaseEngine):
 
     def process_timer_event(self, event: Event) -> None:
         """"""
-        self.timer_count += 1
-        if self.timer_count < self.timer_interval:
-            return
-        self.timer_count = 0
-
         for portfolio_result in self.portfolio_results.values():
             portfolio_result.clear_pnl()
 
@@ -228,6 +224,11 @@ class PortfolioEngine(BaseEngine):
         """"""
         self.timer_interval = interval
 
+        self.event_engine.remove_timer(self.timer_id)
+        self.timer_id = self.event_engine.add_timer(
+            self.timer_interval, self.process_timer_event
+        )
+
     def get_timer_interval(self) -> int:
         """"""
         return self.timer_interval
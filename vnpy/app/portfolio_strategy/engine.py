@@ -40,7 +40,7 @@ from vnpy.trader.constant import (
 from vnpy.trader.utility import load_json, save_json, extract_vt_symbol, round_to
 from vnpy.trader.rqdata import rqdata_client
 from vnpy.trader.converter import OffsetConverter
-from vnpy.trader.database import database_manager
+from vnpy.trader.cache import data_cache
 
 from .base import (
     APP_NAME,
@@ -305,13 +305,7 @@ class StrategyEngine(BaseEngine):
             data = self.query_bar_from_rq(symbol, exchange, interval, start, end)
 
         if not data:
-            data = database_manager.load_bar_data(
-                symbol=symbol,
-                exchange=exchange,
-                interval=interval,
-                start=start,
-                end=end,
-            )
+            data = data_cache.load_bar_data(vt_symbol, interval, start, end)
 
         return data
 
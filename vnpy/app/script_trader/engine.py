@@ -12,7 +12,7 @@ from pandas import DataFrame
 
 from vnpy.event import Event, EventEngine
 from vnpy.trader.engine import BaseEngine, MainEngine
-from vnpy.trader.constant import Direction, Offset, OrderType, Interval
+from vnpy.trader.constant import Direction, Offset, OrderType, Interval, Exchange
 from vnpy.trader.object import (
     OrderRequest,
     HistoryRequest,
@@ -27,6 +27,7 @@ from vnpy.trader.object import (
     BarData
 )
 from vnpy.trader.rqdata import rqdata_client
+from vnpy.trader.cache import data_cache
 
 
 APP_NAME = "ScriptTrader"
@@ -250,16 +251,25 @@ class ScriptEngine(BaseEngine):
         start = datetime.strptime(start_date, "%Y%m%d")
         end = datetime.now()
 
-        req = HistoryRequest(
-            symbol=contract.symbol,
-            exchange=contract.exchange,
-            start=start,
-            end=end,
-            interval=interval
+        # Query from RQData directly if not inited, so that failed query
+        # is not cached as empty data
+        if not rqdata_client.inited:
+            req = HistoryRequest(
+                symbol=contract.symbol,
+                exchange=contract.exchange,
+                start=start,
+                end=end,
+                interval=interval
+            )
+            return get_data(rqdata_client.query_history, arg=req, use_df=use_df)
+
+        return get_data(
+            lambda: data_cache.load_bar_data(
+                vt_symbol, interval, start, end, query_bars, "rqdata"
+            ),
+            use_df=use_df
         )
 
-        return get_data(rqdata_client.query_history, arg=req, use_df=use_df)
-
     def write_log(self, msg: str) -> None:
         """"""
         log = LogData(msg=msg, gateway_name=APP_NAME)
@@ -274,6 +284,26 @@ class ScriptEngine(BaseEngine):
         self.main_engine.send_email(subject, msg)
 
 
+def query_bars(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    start: datetime,
+    end: datetime
+) -> Sequence[BarData]:
+    """
+    Loader of data cache querying bar data from RQData.
+    """
+    req = HistoryRequest(
+        symbol=symbol,
+        exchange=exchange,
+        start=start,
+        end=end,
+        interval=interval
+    )
+    return rqdata_client.query_history(req)
+
+
 def to_df(data_list: Sequence):
     """"""
     if not data_list:
@@ -1,7 +1,6 @@
 from typing import Dict, List
 from datetime import datetime
 from enum import Enum
-from functools import lru_cache
 from parser import expr
 from tzlocal import get_localzone
 
@@ -10,7 +9,7 @@ from vnpy.trader.object import (
 )
 from vnpy.trader.constant import Direction, Offset, Exchange, Interval
 from vnpy.trader.utility import floor_to, ceil_to, round_to, extract_vt_symbol
-from vnpy.trader.database import database_manager
+from vnpy.trader.cache import data_cache
 
 
 EVENT_SPREAD_DATA = "eSpreadData"
@@ -501,7 +500,6 @@ class BacktestingMode(Enum):
     TICK = 2
 
 
-@lru_cache(maxsize=999)
 def load_bar_data(
     spread: SpreadData,
     interval: Interval,
@@ -516,8 +514,8 @@ def load_bar_data(
     for vt_symbol in spread.legs.keys():
         symbol, exchange = extract_vt_symbol(vt_symbol)
 
-        bar_data: List[BarData] = database_manager.load_bar_data(
-            symbol, exchange, interval, start, end
+        bar_data: List[BarData] = data_cache.load_bar_data(
+            vt_symbol, interval, start, end
         )
 
         bars: Dict[datetime, BarData] = {bar.datetime: bar for bar in bar_data}
@@ -562,13 +560,12 @@ def load_bar_data(
     return spread_bars
 
 
-@lru_cache(maxsize=999)
 def load_tick_data(
     spread: SpreadData,
     start: datetime,
     end: datetime
 ):
     """"""
-    return database_manager.load_tick_data(
-        spread.name, Exchange.LOCAL, start, end
+    return data_cache.load_tick_data(
+        f"{spread.name}.{Exchange.LOCAL.value}", start, end
     )
@@ -1,17 +1,28 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 import shelve
 
 from influxdb import InfluxDBClient
 
 from vnpy.trader.constant import Exchange, Interval
-from vnpy.trader.object import BarData, TickData
+from vnpy.trader.object import (
+    BarData,
+    TickData,
+    BarBatch,
+    TickBatch,
+    BAR_FIELDS,
+    TICK_FIELDS,
+    BAR_DTYPE,
+    TICK_DTYPE
+)
 from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
-    convert_tz
+    convert_tz,
+    create_data_array,
+    CHUNK_SIZE
 )
 from vnpy.trader.setting import SETTINGS
 from vnpy.trader.utility import (
@@ -278,6 +289,147 @@ class InfluxdbDatabase(BaseDatabase):
 
         return ticks
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """"""
+        query = (
+            f"select {', '.join(BAR_FIELDS)} from bar_data"
+            " where vt_symbol=$vt_symbol"
+            " and interval=$interval"
+            f" and time >= '{start.date().isoformat()}'"
+            f" and time <= '{end.date().isoformat()}';"
+        )
+
+        bind_params = {
+            "vt_symbol": generate_vt_symbol(symbol, exchange),
+            "interval": interval.value
+        }
+
+        # Time is returned as epoch microseconds, and values of each
+        # point are in the same order as selected fields
+        result = self.client.query(query, bind_params=bind_params, epoch="u")
+        rows = self.get_rows(result)
+        data = create_data_array(rows, BAR_DTYPE)
+
+        return BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """"""
+        query = (
+            f"select name, {', '.join(TICK_FIELDS)} from tick_data"
+            " where vt_symbol=$vt_symbol"
+            f" and time >= '{start.date().isoformat()}'"
+            f" and time <= '{end.date().isoformat()}';"
+        )
+
+        bind_params = {
+            "vt_symbol": generate_vt_symbol(symbol, exchange),
+        }
+
+        result = self.client.query(query, bind_params=bind_params, epoch="u")
+        rows = self.get_rows(result)
+
+        name = rows[0][1] if rows else ""
+        rows = [(row[0], *row[2:]) for row in rows]
+        data = create_data_array(rows, TICK_DTYPE)
+
+        return TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load chunks by pagination on time with limit of chunk_size, as
+        chunked response of query is still read as whole by client.
+        """
+        bind_params = {
+            "vt_symbol": generate_vt_symbol(symbol, exchange),
+            "interval": interval.value
+        }
+        condition = f"time >= '{start.date().isoformat()}'"
+
+        while True:
+            query = (
+                f"select {', '.join(BAR_FIELDS)} from bar_data"
+                " where vt_symbol=$vt_symbol"
+                " and interval=$interval"
+                f" and {condition}"
+                f" and time <= '{end.date().isoformat()}'"
+                f" order by time limit {chunk_size};"
+            )
+
+            result = self.client.query(query, bind_params=bind_params, epoch="u")
+            rows = self.get_rows(result)
+            if rows:
+                data = create_data_array(rows, BAR_DTYPE)
+                yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+            if len(rows) < chunk_size:
+                return
+            condition = f"time > {rows[-1][0]}u"
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load chunks by pagination on time with limit of chunk_size.
+        """
+        bind_params = {
+            "vt_symbol": generate_vt_symbol(symbol, exchange),
+        }
+        condition = f"time >= '{start.date().isoformat()}'"
+
+        while True:
+            query = (
+                f"select name, {', '.join(TICK_FIELDS)} from tick_data"
+                " where vt_symbol=$vt_symbol"
+                f" and {condition}"
+                f" and time <= '{end.date().isoformat()}'"
+                f" order by time limit {chunk_size};"
+            )
+
+            result = self.client.query(query, bind_params=bind_params, epoch="u")
+            rows = self.get_rows(result)
+            if rows:
+                data = create_data_array([(row[0], *row[2:]) for row in rows], TICK_DTYPE)
+                yield TickBatch(symbol, exchange, data, "DB", DB_TZ, rows[0][1])
+
+            if len(rows) < chunk_size:
+                return
+            condition = f"time > {rows[-1][0]}u"
+
+    def get_rows(self, result) -> list:
+        """
+        Get raw values of all points in query result.
+        """
+        rows = []
+        for series in result.raw.get("series", []):
+            rows.extend(series["values"])
+        return rows
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -0,0 +1 @@
+from .memmap_database import database_manager
@@ -0,0 +1,476 @@
+""""""
+import os
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import (
+    BarData,
+    TickData,
+    BarBatch,
+    TickBatch,
+    BAR_DTYPE,
+    TICK_DTYPE,
+    to_datetime64
+)
+from vnpy.trader.database import (
+    BaseDatabase,
+    BarOverview,
+    DB_TZ,
+    convert_tz,
+    get_unique_index,
+    rechunk,
+    CHUNK_SIZE
+)
+from vnpy.trader.utility import get_folder_path
+
+
+# File header contains magic bytes and name of tick data
+MAGIC = b"VNREC001"
+HEADER_SIZE = 64
+
+# Datetime of every INDEX_STEP-th record is kept in sparse index file
+INDEX_STEP = 1024
+
+
+class RecordFile:
+    """
+    Append-only file of fixed-width records sorted by datetime, with a
+    sparse time index in sidecar file.
+
+    Data is read through read-only memory map, so that range reads are
+    zero-copy views, and pages are shared by all processes reading the
+    same file through OS page cache.
+    """
+
+    def __init__(self, path: Path, dtype: np.dtype):
+        """"""
+        self.path: Path = path
+        self.index_path: Path = path.with_suffix(".idx")
+        self.dtype: np.dtype = dtype
+
+        # Memory map and index are reused until file is changed
+        self.key: Tuple[int, int] = None
+        self.data: np.ndarray = None
+        self.index: np.ndarray = None
+
+    def get_count(self) -> int:
+        """
+        Get number of complete records in file.
+        """
+        if not self.path.exists():
+            return 0
+        size = self.path.stat().st_size
+        return max(size - HEADER_SIZE, 0) // self.dtype.itemsize
+
+    def get_name(self) -> str:
+        """
+        Get name saved in file header.
+        """
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        return header[len(MAGIC):].rstrip(b"\x00").decode("UTF-8")
+
+    def open(self) -> np.ndarray:
+        """
+        Get memory mapped records and sparse index.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=self.dtype)
+
+        key = (stat.st_ino, stat.st_size)
+        if key == self.key:
+            return self.data
+
+        count = max(stat.st_size - HEADER_SIZE, 0) // self.dtype.itemsize
+        if count:
+            data = np.memmap(
+                self.path,
+                dtype=self.dtype,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(count,)
+            )
+        else:
+            data = np.empty(0, dtype=self.dtype)
+
+        self.data = data
+        self.index = self.load_index(data)
+        self.key = key
+        return data
+
+    def load_index(self, data: np.ndarray) -> np.ndarray:
+        """
+        Load sparse index, and complete it with records not indexed yet.
+        """
+        dts = data["datetime"]
+
+        index = np.empty(0, dtype="datetime64[us]")
+        if self.index_path.exists():
+            index = np.fromfile(self.index_path, dtype="datetime64[us]")
+
+        # Index may be stale if file is rewritten while being read
+        n = len(index)
+        if n > (len(dts) + INDEX_STEP - 1) // INDEX_STEP or (n and index[-1] != dts[(n - 1) * INDEX_STEP]):
+            index = index[:0]
+            n = 0
+
+        if n * INDEX_STEP < len(dts):
+            index = np.concatenate([index, dts[n * INDEX_STEP::INDEX_STEP]])
+
+        return index
+
+    def search(self, start: np.datetime64, end: np.datetime64) -> np.ndarray:
+        """
+        Get view of records within [start, end] by binary search of
+        sparse index and then within one block of records.
+        """
+        data = self.open()
+        if not len(data):
+            return data
+
+        dts = data["datetime"]
+        index = self.index
+        count = len(dts)
+
+        k = np.searchsorted(index, start, "left")
+        lo = max((k - 1) * INDEX_STEP, 0)
+        hi = min(k * INDEX_STEP, count)
+        ix_start = lo + np.searchsorted(dts[lo:hi], start, "left")
+
+        k = np.searchsorted(index, end, "right")
+        lo = max((k - 1) * INDEX_STEP, 0)
+        hi = min(k * INDEX_STEP, count)
+        ix_end = lo + np.searchsorted(dts[lo:hi], end, "right")
+
+        return data[ix_start:max(ix_start, ix_end)]
+
+    def write(self, data: np.ndarray, name: str = "") -> int:
+        """
+        Write sorted unique records, and return number of new records
+        (not including replaced ones).
+        """
+        old = self.open()
+        count = len(old)
+
+        # Append if all new data is after existing data
+        if not count or data["datetime"][0] > old["datetime"][-1]:
+            self.append(data, count, name)
+            return len(data)
+
+        # Otherwise rewrite whole file, new data replaces old one
+        merged = np.concatenate([old, data])
+        merged = merged[get_unique_index(merged["datetime"])]
+
+        del old
+        self.rewrite(merged, name)
+
+        return len(merged) - count
+
+    def append(self, data: np.ndarray, count: int, name: str) -> None:
+        """"""
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(get_header(name))
+
+        with open(self.path, "r+b") as f:
+            # Remove incomplete record left by crash
+            f.truncate(HEADER_SIZE + count * self.dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(data.tobytes())
+
+        # Index entries of new records at multiples of INDEX_STEP
+        n = (count + INDEX_STEP - 1) // INDEX_STEP
+        first = n * INDEX_STEP - count
+        entries = data["datetime"][first::INDEX_STEP]
+
+        mode = "r+b" if self.index_path.exists() else "wb"
+        with open(self.index_path, mode) as f:
+            f.truncate(n * 8)
+            f.seek(0, os.SEEK_END)
+            f.write(entries.tobytes())
+
+    def close(self) -> None:
+        """
+        Drop memory map and index, so that file is unmapped once views
+        returned by search are released.
+        """
+        self.key = None
+        self.data = None
+        self.index = None
+
+    def rewrite(self, data: np.ndarray, name: str) -> None:
+        """
+        Replace file atomically, readers keep their mapping of old file.
+
+        On Windows a mapped file cannot be replaced, so PermissionError is
+        raised while other processes (or views of this one) still map it.
+        """
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(get_header(name))
+            f.write(data.tobytes())
+
+        index = np.ascontiguousarray(data["datetime"][::INDEX_STEP])
+        temp_index_path = self.index_path.with_suffix(".idx.tmp")
+        index.tofile(temp_index_path)
+
+        self.close()
+        os.replace(temp_path, self.path)
+        os.replace(temp_index_path, self.index_path)
+
+    def delete(self) -> int:
+        """
+        Delete file and return number of records.
+
+        Same as rewrite, PermissionError is raised on Windows while file
+        is still mapped by other processes.
+        """
+        count = self.get_count()
+        self.close()
+
+        for path in [self.path, self.index_path]:
+            if path.exists():
+                path.unlink()
+
+        return count
+
+
+class MemmapDatabase(BaseDatabase):
+    """
+    Bar and tick data stored in memory mapped record files:
+
+        bar/{exchange}/{symbol}_{interval}.rec
+        tick/{exchange}/{symbol}.rec
+
+    Only one process should write data, while any number of processes
+    (e.g. backtesting workers) can read at the same time. On Windows,
+    saving data before the end of existing data and deleting data need
+    file replaced or removed, which fails with PermissionError until
+    other processes reading the file are closed.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.root: Path = get_folder_path("memmap")
+        self.files: Dict[Path, RecordFile] = {}
+        self.lock: Lock = Lock()
+
+    def save_bar_data(self, bars: List[BarData]) -> bool:
+        """"""
+        bar = bars[0]
+        file = self.get_bar_file(bar.symbol, bar.exchange, bar.interval)
+
+        data = BarBatch.create_array(bars)
+        data = data[get_unique_index(data["datetime"])]
+
+        with self.lock:
+            file.write(data)
+
+        return True
+
+    def save_tick_data(self, ticks: List[TickData]) -> bool:
+        """"""
+        tick = ticks[0]
+        file = self.get_tick_file(tick.symbol, tick.exchange)
+
+        data = TickBatch.create_array(ticks)
+        data = data[get_unique_index(data["datetime"])]
+
+        with self.lock:
+            file.write(data, tick.name)
+
+        return True
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> List[BarData]:
+        """"""
+        batch = self.load_bar_array(symbol, exchange, interval, start, end)
+        return batch.to_bars()
+
+    def load_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> List[TickData]:
+        """"""
+        batch = self.load_tick_array(symbol, exchange, start, end)
+        return batch.to_ticks()
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """
+        Load bar data as read-only view of memory mapped file.
+        """
+        file = self.get_bar_file(symbol, exchange, interval)
+
+        with self.lock:
+            data = file.search(to_datetime64(start), to_datetime64(end))
+
+        return BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """
+        Load tick data as read-only view of memory mapped file.
+        """
+        file = self.get_tick_file(symbol, exchange)
+
+        with self.lock:
+            data = file.search(to_datetime64(start), to_datetime64(end))
+            name = file.get_name() if len(data) else ""
+
+        return TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load chunks as views of memory mapped file, pages of each chunk
+        are only read when accessed.
+        """
+        batch = self.load_bar_array(symbol, exchange, interval, start, end)
+
+        for data in rechunk([batch.data], chunk_size):
+            yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load chunks as views of memory mapped file.
+        """
+        batch = self.load_tick_array(symbol, exchange, start, end)
+
+        for data in rechunk([batch.data], chunk_size):
+            yield TickBatch(symbol, exchange, data, "DB", DB_TZ, batch.name)
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> int:
+        """"""
+        file = self.get_bar_file(symbol, exchange, interval)
+
+        with self.lock:
+            return file.delete()
+
+    def delete_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange
+    ) -> int:
+        """"""
+        file = self.get_tick_file(symbol, exchange)
+
+        with self.lock:
+            return file.delete()
+
+    def get_bar_overview(self) -> List[BarOverview]:
+        """
+        Return data avaible in database.
+        """
+        overviews = []
+
+        for path in sorted(self.root.glob("bar/*/*.rec")):
+            symbol, interval = path.stem.rsplit("_", 1)
+            exchange = Exchange(path.parent.name)
+            interval = Interval(interval)
+
+            file = self.get_bar_file(symbol, exchange, interval)
+            with self.lock:
+                data = file.open()
+
+            if not len(data):
+                continue
+
+            overview = BarOverview(
+                symbol=symbol,
+                exchange=exchange,
+                interval=interval,
+                count=len(data),
+                start=to_datetime(data["datetime"][0]),
+                end=to_datetime(data["datetime"][-1])
+            )
+            overviews.append(overview)
+
+        return overviews
+
+    def get_bar_file(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> RecordFile:
+        """"""
+        path = self.root.joinpath("bar", exchange.value, f"{symbol}_{interval.value}.rec")
+        return self.get_file(path, BAR_DTYPE)
+
+    def get_tick_file(self, symbol: str, exchange: Exchange) -> RecordFile:
+        """"""
+        path = self.root.joinpath("tick", exchange.value, f"{symbol}.rec")
+        return self.get_file(path, TICK_DTYPE)
+
+    def get_file(self, path: Path, dtype: np.dtype) -> RecordFile:
+        """"""
+        file = self.files.get(path, None)
+        if not file:
+            file = RecordFile(path, dtype)
+            self.files[path] = file
+        return file
+
+
+def get_header(name: str) -> bytes:
+    """"""
+    data = name.encode("UTF-8")[:HEADER_SIZE - len(MAGIC)]
+    return (MAGIC + data).ljust(HEADER_SIZE, b"\x00")
+
+
+def to_datetime(dt: np.datetime64) -> datetime:
+    """
+    Convert UTC datetime64 into naive datetime of DB_TZ.
+    """
+    timestamp = dt.astype("int64") / 1_000_000
+    return convert_tz(datetime.fromtimestamp(timestamp, DB_TZ))
+
+
+database_manager = MemmapDatabase()
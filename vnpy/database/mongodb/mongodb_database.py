@@ -1,6 +1,6 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Sequence
 
 from mongoengine import (
     Document,
@@ -14,12 +14,21 @@ from mongoengine import (
 from mongoengine.errors import DoesNotExist
 
 from vnpy.trader.constant import Exchange, Interval
-from vnpy.trader.object import BarData, TickData
+from vnpy.trader.object import (
+    BarData,
+    TickData,
+    BarBatch,
+    TickBatch,
+    BAR_DTYPE,
+    TICK_DTYPE
+)
 from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
-    convert_tz
+    convert_tz,
+    create_data_array,
+    CHUNK_SIZE
 )
 from vnpy.trader.setting import SETTINGS
 
@@ -277,6 +286,107 @@ class MongodbDatabase(BaseDatabase):
 
         return ticks
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """"""
+        # Read raw documents without creating Document objects
+        s: QuerySet = DbBarData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            interval=interval.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).only(*BAR_DTYPE.names).order_by("datetime").as_pymongo()
+
+        names = BAR_DTYPE.names
+        rows = [tuple(d.get(n, None) for n in names) for d in s]
+        data = create_data_array(rows, BAR_DTYPE)
+
+        return BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """"""
+        s: QuerySet = DbTickData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).only("name", *TICK_DTYPE.names).order_by("datetime").as_pymongo()
+
+        names = TICK_DTYPE.names
+        name = ""
+        rows = []
+        for d in s:
+            if not rows:
+                name = d.get("name", "")
+            rows.append(tuple(d.get(n, None) for n in names))
+
+        data = create_data_array(rows, TICK_DTYPE)
+
+        return TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load chunks from server side cursor, which fetches chunk_size
+        documents in each batch, and results are not cached by QuerySet.
+        """
+        s: QuerySet = DbBarData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            interval=interval.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).only(*BAR_DTYPE.names).order_by("datetime").as_pymongo()
+        s = s.no_cache().batch_size(chunk_size)
+
+        for rows in iter_rows(s, BAR_DTYPE.names, chunk_size):
+            data = create_data_array(rows, BAR_DTYPE)
+            yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load chunks from server side cursor.
+        """
+        s: QuerySet = DbTickData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).only("name", *TICK_DTYPE.names).order_by("datetime").as_pymongo()
+        s = s.no_cache().batch_size(chunk_size)
+
+        names = ("name",) + TICK_DTYPE.names
+        for rows in iter_rows(s, names, chunk_size):
+            data = create_data_array([row[1:] for row in rows], TICK_DTYPE)
+            yield TickBatch(symbol, exchange, data, "DB", DB_TZ, rows[0][0] or "")
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -388,4 +498,20 @@ def to_update_param(d: dict) -> dict:
     return param
 
 
+def iter_rows(s: QuerySet, names: Sequence[str], chunk_size: int) -> Iterator[List[tuple]]:
+    """
+    Get values of raw documents from cursor as lists of chunk_size rows.
+    """
+    rows = []
+    for d in s:
+        rows.append(tuple(d.get(n, None) for n in names))
+
+        if len(rows) == chunk_size:
+            yield rows
+            rows = []
+
+    if rows:
+        yield rows
+
+
 database_manager = MongodbDatabase()
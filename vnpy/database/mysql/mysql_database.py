@@ -23,6 +23,7 @@ from vnpy.trader.database import (
     DB_TZ,
     convert_tz
 )
+from vnpy.database.peewee_mixin import PeeweeArrayMixin
 from vnpy.trader.setting import SETTINGS
 
 
@@ -125,9 +126,12 @@ class DbBarOverview(Model):
         indexes = ((("symbol", "exchange", "interval"), True),)
 
 
-class MysqlDatabase(BaseDatabase):
+class MysqlDatabase(PeeweeArrayMixin, BaseDatabase):
     """"""
 
+    bar_model = DbBarData
+    tick_model = DbTickData
+
     def __init__(self) -> None:
         """"""
         self.db = db
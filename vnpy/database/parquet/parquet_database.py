@@ -0,0 +1,586 @@
+""""""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from itertools import chain
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import (
+    BarData,
+    TickData,
+    BarBatch,
+    TickBatch,
+    BAR_FIELDS,
+    TICK_FIELDS,
+    BAR_DTYPE,
+    TICK_DTYPE
+)
+from vnpy.trader.database import (
+    BaseDatabase,
+    BarOverview,
+    DB_TZ,
+    convert_tz,
+    get_unique_index,
+    rechunk,
+    CHUNK_SIZE
+)
+from vnpy.trader.utility import get_folder_path, get_local_datetime64
+
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+BAR_SCHEMA = pa.schema(
+    [("datetime", TIMESTAMP)]
+    + [(f, pa.float64()) for f in BAR_FIELDS]
+)
+TICK_SCHEMA = pa.schema(
+    [("datetime", TIMESTAMP), ("name", pa.string())]
+    + [(f, pa.float64()) for f in TICK_FIELDS]
+)
+
+# Appended parts of one day partition are merged into one file when
+# there are more than this number of them.
+MAX_PARTS = 32
+
+
+class ParquetDatabase(BaseDatabase):
+    """
+    Local columnar store of bar and tick data in Parquet files:
+
+        bar/{exchange}/{symbol}/{interval}/{YYYYMMDD}/{seq}.parquet
+        tick/{exchange}/{symbol}/{YYYYMMDD}/{seq}.parquet
+
+    Day is the date of DB_TZ. Parts of each day never overlap in time
+    and are ordered by sequence number, so that data appended by
+    recorder is written as a new part without rewriting existing files.
+    Data overlapping with existing parts is merged (replacing rows of
+    the same datetime) into one part of the day.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.root: Path = get_folder_path("parquet")
+        self.lock: Lock = Lock()
+
+        self.overview_path: Path = self.root.joinpath("bar_overview.json")
+        self.overviews: Dict[str, dict] = {}
+
+        if self.overview_path.exists():
+            with open(self.overview_path, encoding="UTF-8") as f:
+                self.overviews = json.load(f)
+
+    def save_bar_data(self, bars: List[BarData]) -> bool:
+        """"""
+        bar = bars[0]
+        symbol = bar.symbol
+        exchange = bar.exchange
+        interval = bar.interval
+
+        data = BarBatch.create_array(bars)
+        columns = {f: data[f] for f in BAR_FIELDS}
+
+        folder = self.get_bar_folder(symbol, exchange, interval)
+
+        with self.lock:
+            count = self.write_data(folder, data["datetime"], columns, BAR_SCHEMA)
+
+            # Update bar overview
+            start = convert_tz(datetime.fromtimestamp(
+                data["datetime"].min().astype("int64") / 1_000_000, DB_TZ
+            ))
+            end = convert_tz(datetime.fromtimestamp(
+                data["datetime"].max().astype("int64") / 1_000_000, DB_TZ
+            ))
+
+            key = get_overview_key(symbol, exchange, interval)
+            overview = self.overviews.get(key, None)
+
+            if not overview:
+                overview = {
+                    "symbol": symbol,
+                    "exchange": exchange.value,
+                    "interval": interval.value,
+                    "count": count,
+                    "start": start.isoformat(),
+                    "end": end.isoformat(),
+                }
+                self.overviews[key] = overview
+            else:
+                overview["count"] += count
+                overview["start"] = min(start.isoformat(), overview["start"])
+                overview["end"] = max(end.isoformat(), overview["end"])
+
+            self.save_overviews()
+
+        return True
+
+    def save_tick_data(self, ticks: List[TickData]) -> bool:
+        """"""
+        tick = ticks[0]
+
+        data = TickBatch.create_array(ticks)
+        columns = {f: data[f] for f in TICK_FIELDS}
+        columns["name"] = [t.name for t in ticks]
+
+        folder = self.get_tick_folder(tick.symbol, tick.exchange)
+
+        with self.lock:
+            self.write_data(folder, data["datetime"], columns, TICK_SCHEMA)
+
+        return True
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> List[BarData]:
+        """"""
+        batch = self.load_bar_array(symbol, exchange, interval, start, end)
+        return batch.to_bars()
+
+    def load_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> List[TickData]:
+        """"""
+        batch = self.load_tick_array(symbol, exchange, start, end)
+        return batch.to_ticks()
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        table = read_table(folder, BAR_SCHEMA, start, end)
+        data = to_array(table, BAR_DTYPE)
+
+        return BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """"""
+        folder = self.get_tick_folder(symbol, exchange)
+        table = read_table(folder, TICK_SCHEMA, start, end)
+        data = to_array(table, TICK_DTYPE)
+
+        name = table.column("name")[0].as_py() if table.num_rows else ""
+
+        return TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load chunks by reading one day partition at a time.
+        """
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        tables = iter_tables(folder, BAR_SCHEMA, start, end)
+        arrays = (to_array(table, BAR_DTYPE) for table in tables)
+
+        for data in rechunk(arrays, chunk_size):
+            yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load chunks by reading one day partition at a time.
+        """
+        folder = self.get_tick_folder(symbol, exchange)
+        tables = iter_tables(folder, TICK_SCHEMA, start, end)
+
+        first = next(tables, None)
+        if not first:
+            return
+        name = first.column("name")[0].as_py()
+
+        arrays = (to_array(table, TICK_DTYPE) for table in chain([first], tables))
+        for data in rechunk(arrays, chunk_size):
+            yield TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> int:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+
+        with self.lock:
+            count = delete_folder(folder)
+
+            # Delete bar overview
+            key = get_overview_key(symbol, exchange, interval)
+            if self.overviews.pop(key, None):
+                self.save_overviews()
+
+        return count
+
+    def delete_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange
+    ) -> int:
+        """"""
+        folder = self.get_tick_folder(symbol, exchange)
+
+        with self.lock:
+            count = delete_folder(folder)
+
+        return count
+
+    def get_bar_overview(self) -> List[BarOverview]:
+        """
+        Return data avaible in database.
+        """
+        with self.lock:
+            # Init bar overview if data files are copied from elsewhere
+            if not self.overview_path.exists():
+                self.init_bar_overview()
+
+            overviews = []
+            for d in self.overviews.values():
+                overview = BarOverview(
+                    symbol=d["symbol"],
+                    exchange=Exchange(d["exchange"]),
+                    interval=Interval(d["interval"]),
+                    count=d["count"],
+                    start=datetime.fromisoformat(d["start"]),
+                    end=datetime.fromisoformat(d["end"]),
+                )
+                overviews.append(overview)
+
+        return overviews
+
+    def init_bar_overview(self) -> None:
+        """
+        Init overview by scanning all bar data files.
+        """
+        self.overviews.clear()
+
+        for folder in self.root.glob("bar/*/*/*"):
+            days = get_days(folder)
+            if not days:
+                continue
+
+            exchange = Exchange(folder.parent.parent.name)
+            symbol = folder.parent.name
+            interval = Interval(folder.name)
+
+            count = sum(get_count(day) for day in days)
+            first = read_datetime(get_parts(days[0])[0]).min()
+            last = read_datetime(get_parts(days[-1])[-1]).max()
+
+            start = convert_tz(datetime.fromtimestamp(
+                first.astype("int64") / 1_000_000, DB_TZ
+            ))
+            end = convert_tz(datetime.fromtimestamp(
+                last.astype("int64") / 1_000_000, DB_TZ
+            ))
+
+            key = get_overview_key(symbol, exchange, interval)
+            self.overviews[key] = {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+                "count": count,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+            }
+
+        self.save_overviews()
+
+    def save_overviews(self) -> None:
+        """
+        Save bar overview into json file, replaced atomically.
+        """
+        temp_path = self.overview_path.with_suffix(".tmp")
+        with open(temp_path, mode="w+", encoding="UTF-8") as f:
+            json.dump(self.overviews, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, self.overview_path)
+
+    def get_bar_folder(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> Path:
+        """"""
+        return self.root.joinpath("bar", exchange.value, symbol, interval.value)
+
+    def get_tick_folder(self, symbol: str, exchange: Exchange) -> Path:
+        """"""
+        return self.root.joinpath("tick", exchange.value, symbol)
+
+    def write_data(
+        self,
+        folder: Path,
+        dts: np.ndarray,
+        columns: dict,
+        schema: pa.Schema
+    ) -> int:
+        """
+        Write data into day partitions, and return number of new rows
+        (not including replaced ones).
+        """
+        table = pa.table(
+            {"datetime": pa.array(dts, TIMESTAMP), **columns},
+            schema=schema
+        )
+
+        # Sort by datetime and keep the last one of same datetime
+        table = table.take(get_unique_index(dts))
+        dts = table.column("datetime").to_numpy()
+
+        # Split into DB_TZ days, which are in ascending order after sort
+        days = get_local_datetime64(dts, DB_TZ).astype("datetime64[D]")
+        changed = np.flatnonzero(days[1:] != days[:-1]) + 1
+        bounds = [0] + changed.tolist() + [len(days)]
+
+        count = 0
+        for ix_start, ix_end in zip(bounds[:-1], bounds[1:]):
+            day = days[ix_start].astype(datetime).strftime("%Y%m%d")
+            day_table = table.slice(ix_start, ix_end - ix_start)
+            count += write_day(folder.joinpath(day), day_table)
+
+        return count
+
+
+def write_day(folder: Path, table: pa.Table) -> int:
+    """
+    Write sorted unique data of one day, and return number of new rows.
+    """
+    parts = get_parts(folder)
+
+    if not parts:
+        folder.mkdir(parents=True, exist_ok=True)
+        write_part(folder, 0, table)
+        return table.num_rows
+
+    seq = int(parts[-1].stem) + 1
+    last_dt = read_datetime(parts[-1]).max()
+    first_dt = table.column("datetime").to_numpy()[0]
+
+    # Append new part if all new data is after existing data
+    if first_dt > last_dt:
+        write_part(folder, seq, table)
+        parts.append(folder.joinpath(f"{seq:06d}.parquet"))
+
+        if len(parts) <= MAX_PARTS:
+            return table.num_rows
+
+        merged = pq.ParquetDataset([str(p) for p in parts]).read()
+        old_count = merged.num_rows - table.num_rows
+    # Otherwise merge all data of the day, new data replaces old one
+    else:
+        old = pq.ParquetDataset([str(p) for p in parts]).read()
+        old_count = old.num_rows
+
+        merged = pa.concat_tables([old, table.cast(old.schema)])
+        dts = merged.column("datetime").to_numpy()
+        merged = merged.take(get_unique_index(dts))
+
+    # Merged part has higher seq than existing parts, so that it takes
+    # priority in case of crash before old parts are removed.
+    write_part(folder, seq + 1, merged)
+
+    for path in parts:
+        if path.exists() and int(path.stem) <= seq:
+            path.unlink()
+
+    return merged.num_rows - old_count
+
+
+def write_part(folder: Path, seq: int, table: pa.Table) -> None:
+    """
+    Write part file of day partition, replaced atomically.
+    """
+    path = folder.joinpath(f"{seq:06d}.parquet")
+    temp_path = path.with_suffix(".tmp")
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def read_table(
+    folder: Path,
+    schema: pa.Schema,
+    start: datetime,
+    end: datetime
+) -> pa.Table:
+    """
+    Read data within [start, end] from day partitions of folder. Days out
+    of range are skipped, and time range filter is pushed down to row
+    groups of each file.
+    """
+    start = to_utc(start)
+    end = to_utc(end)
+
+    paths = []
+    for day in get_days_within(folder, start, end):
+        paths.extend(str(p) for p in get_parts(day))
+
+    return read_parts(paths, schema, start, end)
+
+
+def iter_tables(
+    folder: Path,
+    schema: pa.Schema,
+    start: datetime,
+    end: datetime
+) -> Iterator[pa.Table]:
+    """
+    Read data within [start, end] by one day partition at a time.
+    """
+    start = to_utc(start)
+    end = to_utc(end)
+
+    for day in get_days_within(folder, start, end):
+        paths = [str(p) for p in get_parts(day)]
+        table = read_parts(paths, schema, start, end)
+        if table.num_rows:
+            yield table
+
+
+def read_parts(
+    paths: List[str],
+    schema: pa.Schema,
+    start: datetime,
+    end: datetime
+) -> pa.Table:
+    """
+    Read data within UTC [start, end] from part files.
+    """
+    if not paths:
+        return schema.empty_table()
+
+    dataset = ds.dataset(paths, schema=schema, format="parquet")
+    expression = (
+        (ds.field("datetime") >= pa.scalar(start, TIMESTAMP))
+        & (ds.field("datetime") <= pa.scalar(end, TIMESTAMP))
+    )
+    table = dataset.to_table(filter=expression)
+
+    # Parts may overlap only if process crashed during merge
+    dts = table.column("datetime").to_numpy()
+    if len(dts) and not (dts[1:] > dts[:-1]).all():
+        table = table.take(get_unique_index(dts))
+
+    return table
+
+
+def to_array(table: pa.Table, dtype: np.dtype) -> np.ndarray:
+    """
+    Convert table into structured array of dtype.
+    """
+    data = np.empty(table.num_rows, dtype=dtype)
+    for name in dtype.names:
+        data[name] = table.column(name).to_numpy()
+    return data
+
+
+def read_datetime(path: Path) -> np.ndarray:
+    """
+    Read datetime column of part file.
+    """
+    table = pq.read_table(path, columns=["datetime"])
+    return table.column("datetime").to_numpy()
+
+
+def get_days(folder: Path) -> List[Path]:
+    """
+    Get sorted day partition folders.
+    """
+    if not folder.exists():
+        return []
+    return sorted(p for p in folder.iterdir() if p.is_dir())
+
+
+def get_days_within(folder: Path, start: datetime, end: datetime) -> List[Path]:
+    """
+    Get sorted day partition folders within [start, end].
+    """
+    start_day = start.astimezone(DB_TZ).strftime("%Y%m%d")
+    end_day = end.astimezone(DB_TZ).strftime("%Y%m%d")
+    return [day for day in get_days(folder) if start_day <= day.name <= end_day]
+
+
+def get_parts(folder: Path) -> List[Path]:
+    """
+    Get part files of day partition in order of sequence.
+    """
+    if not folder.exists():
+        return []
+    return sorted(folder.glob("*.parquet"))
+
+
+def get_count(folder: Path) -> int:
+    """
+    Get number of rows in day partition from file metadata.
+    """
+    return sum(pq.read_metadata(p).num_rows for p in get_parts(folder))
+
+
+def delete_folder(folder: Path) -> int:
+    """
+    Delete all day partitions of folder, and return number of rows.
+    """
+    if not folder.exists():
+        return 0
+
+    count = sum(get_count(day) for day in get_days(folder))
+    shutil.rmtree(folder)
+    return count
+
+
+def to_utc(dt: datetime) -> datetime:
+    """
+    Convert datetime into UTC, naive datetime is treated as DB_TZ.
+    """
+    if not dt.tzinfo:
+        dt = DB_TZ.localize(dt)
+    return dt.astimezone(timezone.utc)
+
+
+def get_overview_key(symbol: str, exchange: Exchange, interval: Interval) -> str:
+    """"""
+    return f"{symbol}.{exchange.value}_{interval.value}"
+
+
+database_manager = ParquetDatabase()
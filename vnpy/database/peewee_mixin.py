@@ -0,0 +1,150 @@
+"""
+Columnar loading shared by database drivers based on peewee.
+"""
+
+from datetime import datetime
+from typing import Iterator, Type
+
+from peewee import Database, Model, ModelSelect
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarBatch, TickBatch, BAR_DTYPE, TICK_DTYPE
+from vnpy.trader.database import DB_TZ, create_data_array, CHUNK_SIZE
+
+
+class PeeweeArrayMixin:
+    """
+    Load structured arrays from raw cursor rows without creating model
+    objects, at once or in chunks by keyset pagination. It should be put
+    before BaseDatabase in bases of driver.
+
+    Models of bar and tick data should have symbol, exchange, interval
+    (bar only), name (tick only) and all fields of BAR_DTYPE/TICK_DTYPE.
+    """
+
+    db: Database = None
+    bar_model: Type[Model] = None
+    tick_model: Type[Model] = None
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """"""
+        model = self.bar_model
+        columns = [getattr(model, f) for f in BAR_DTYPE.names]
+        s: ModelSelect = (
+            model.select(*columns).where(
+                (model.symbol == symbol)
+                & (model.exchange == exchange.value)
+                & (model.interval == interval.value)
+                & (model.datetime >= start)
+                & (model.datetime <= end)
+            ).order_by(model.datetime)
+        )
+
+        # Read raw rows from cursor without creating model objects
+        rows = self.db.execute(s).fetchall()
+        data = create_data_array(rows, BAR_DTYPE)
+
+        return BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """"""
+        model = self.tick_model
+        columns = [getattr(model, f) for f in TICK_DTYPE.names]
+        s: ModelSelect = (
+            model.select(model.name, *columns).where(
+                (model.symbol == symbol)
+                & (model.exchange == exchange.value)
+                & (model.datetime >= start)
+                & (model.datetime <= end)
+            ).order_by(model.datetime)
+        )
+
+        rows = self.db.execute(s).fetchall()
+        name = rows[0][0] if rows else ""
+        data = create_data_array([row[1:] for row in rows], TICK_DTYPE)
+
+        return TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load chunks by keyset pagination on datetime index, so that no
+        cursor or transaction is kept open between chunks.
+        """
+        model = self.bar_model
+        columns = [getattr(model, f) for f in BAR_DTYPE.names]
+        condition = model.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                model.select(*columns).where(
+                    (model.symbol == symbol)
+                    & (model.exchange == exchange.value)
+                    & (model.interval == interval.value)
+                    & condition
+                    & (model.datetime <= end)
+                ).order_by(model.datetime).limit(chunk_size)
+            )
+
+            rows = self.db.execute(s).fetchall()
+            if rows:
+                data = create_data_array(rows, BAR_DTYPE)
+                yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+            if len(rows) < chunk_size:
+                return
+            condition = model.datetime > rows[-1][0]
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load chunks by keyset pagination on datetime index.
+        """
+        model = self.tick_model
+        columns = [getattr(model, f) for f in TICK_DTYPE.names]
+        condition = model.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                model.select(model.name, *columns).where(
+                    (model.symbol == symbol)
+                    & (model.exchange == exchange.value)
+                    & condition
+                    & (model.datetime <= end)
+                ).order_by(model.datetime).limit(chunk_size)
+            )
+
+            rows = self.db.execute(s).fetchall()
+            if rows:
+                data = create_data_array([row[1:] for row in rows], TICK_DTYPE)
+                yield TickBatch(symbol, exchange, data, "DB", DB_TZ, rows[0][0])
+
+            if len(rows) < chunk_size:
+                return
+            condition = model.datetime > rows[-1][1]
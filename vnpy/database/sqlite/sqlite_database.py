@@ -1,5 +1,6 @@
 """"""
 from datetime import datetime
+from operator import attrgetter
 from typing import List
 
 from peewee import (
@@ -18,16 +19,38 @@ from peewee import (
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 from vnpy.trader.utility import get_file_path
+from vnpy.trader.setting import SETTINGS
 from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
     convert_tz
 )
+from vnpy.database.peewee_mixin import PeeweeArrayMixin
 
 
 path = str(get_file_path("database.db"))
-db = PeeweeSqliteDatabase(path)
+
+pragmas = {
+    "cache_size": -64000,
+    "temp_store": "memory",
+}
+
+# WAL journal lets readers run during bulk writes, and with it synchronous
+# NORMAL only syncs at checkpoints instead of every transaction, so that
+# the last transactions may be lost (not corrupted) on power failure.
+# Journal mode is kept in database file, so it is always set to switch
+# back to the default rollback journal.
+if SETTINGS["database.sqlite_wal"]:
+    pragmas["journal_mode"] = "wal"
+    pragmas["synchronous"] = "normal"
+else:
+    pragmas["journal_mode"] = "delete"
+
+db = PeeweeSqliteDatabase(path, pragmas=pragmas)
+
+# Number of rows written by each executemany call
+BATCH_SIZE = 100_000
 
 
 class DbBarData(Model):
@@ -120,9 +143,12 @@ class DbBarOverview(Model):
         indexes = ((("symbol", "exchange", "interval"), True),)
 
 
-class SqliteDatabase(BaseDatabase):
+class SqliteDatabase(PeeweeArrayMixin, BaseDatabase):
     """"""
 
+    bar_model = DbBarData
+    tick_model = DbTickData
+
     def __init__(self) -> None:
         """"""
         self.db = db
@@ -137,25 +163,52 @@ class SqliteDatabase(BaseDatabase):
         exchange = bar.exchange
         interval = bar.interval
 
-        # Convert bar object to dict and adjust timezone
-        data = []
-
-        for bar in bars:
-            bar.datetime = convert_tz(bar.datetime)
+        sql = get_insert_sql(DbBarData)
+        count_sql = (
+            "SELECT COUNT(*) FROM dbbardata WHERE symbol = ? AND exchange = ?"
+            " AND interval = ? AND datetime >= ? AND datetime <= ?"
+        )
 
-            d = bar.__dict__
-            d["exchange"] = d["exchange"].value
-            d["interval"] = d["interval"].value
-            d.pop("gateway_name")
-            d.pop("vt_symbol")
-            data.append(d)
+        start = end = None
+        delta = 0
 
-        # Upsert data into database
         with self.db.atomic():
-            for c in chunked(data, 50):
-                DbBarData.insert_many(c).on_conflict_replace().execute()
+            for c in chunked(bars, BATCH_SIZE):
+                # Convert bar object to row tuple and adjust timezone
+                rows = [
+                    (
+                        symbol,
+                        exchange.value,
+                        str(convert_tz(bar.datetime)),
+                        interval.value,
+                        bar.volume,
+                        bar.open_interest,
+                        bar.open_price,
+                        bar.high_price,
+                        bar.low_price,
+                        bar.close_price,
+                    )
+                    for bar in c
+                ]
+
+                # Count only new rows (not replaced ones) within the same
+                # range of datetime, which is served by index.
+                first = min(row[2] for row in rows)
+                last = max(row[2] for row in rows)
+                params = (symbol, exchange.value, interval.value, first, last)
+
+                before = self.db.execute_sql(count_sql, params).fetchone()[0]
+                self.db.cursor().executemany(sql, rows)
+                after = self.db.execute_sql(count_sql, params).fetchone()[0]
+
+                delta += after - before
+                start = min(start, first) if start else first
+                end = max(end, last) if end else last
 
         # Update bar overview
+        start = DbBarData.datetime.python_value(start)
+        end = DbBarData.datetime.python_value(end)
+
         overview: DbBarOverview = DbBarOverview.get_or_none(
             DbBarOverview.symbol == symbol,
             DbBarOverview.exchange == exchange.value,
@@ -167,40 +220,37 @@ class SqliteDatabase(BaseDatabase):
             overview.symbol = symbol
             overview.exchange = exchange.value
             overview.interval = interval.value
-            overview.start = bars[0].datetime
-            overview.end = bars[-1].datetime
-            overview.count = len(bars)
+            overview.start = start
+            overview.end = end
+            overview.count = delta
         else:
-            overview.start = min(bars[0].datetime, overview.start)
-            overview.end = max(bars[-1].datetime, overview.end)
-
-            s: ModelSelect = DbBarData.select().where(
-                (DbBarData.symbol == symbol)
-                & (DbBarData.exchange == exchange.value)
-                & (DbBarData.interval == interval.value)
-            )
-            overview.count = s.count()
+            overview.start = min(start, overview.start)
+            overview.end = max(end, overview.end)
+            overview.count += delta
 
         overview.save()
 
     def save_tick_data(self, ticks: List[TickData]) -> bool:
         """"""
-        # Convert bar object to dict and adjust timezone
-        data = []
-
-        for tick in ticks:
-            tick.datetime = convert_tz(tick.datetime)
+        sql = get_insert_sql(DbTickData)
 
-            d = tick.__dict__
-            d["exchange"] = d["exchange"].value
-            d.pop("gateway_name")
-            d.pop("vt_symbol")
-            data.append(d)
+        # Fields after symbol, exchange and datetime are read from tick
+        fields = [f.name for f in DbTickData._meta.sorted_fields[4:]]
+        get_values = attrgetter(*fields)
 
-        # Upsert data into database
         with self.db.atomic():
-            for c in chunked(data, 10):
-                DbTickData.insert_many(c).on_conflict_replace().execute()
+            for c in chunked(ticks, BATCH_SIZE):
+                # Convert tick object to row tuple and adjust timezone
+                rows = [
+                    (
+                        tick.symbol,
+                        tick.exchange.value,
+                        str(convert_tz(tick.datetime)),
+                        *get_values(tick)
+                    )
+                    for tick in c
+                ]
+                self.db.cursor().executemany(sql, rows)
 
     def load_bar_data(
         self,
@@ -367,4 +417,15 @@ class SqliteDatabase(BaseDatabase):
             overview.save()
 
 
+def get_insert_sql(model: Model) -> str:
+    """
+    Get upsert statement of all fields except id, in order of definition.
+    """
+    fields = model._meta.sorted_fields[1:]
+    columns = ", ".join(f.column_name for f in fields)
+    marks = ", ".join("?" for f in fields)
+    table = model._meta.table_name
+    return f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({marks})"
+
+
 database_manager = SqliteDatabase()
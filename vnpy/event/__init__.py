@@ -1 +1,11 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    ShardedEventEngine,
+    EventQueue,
+    ConflatingQueue,
+    EVENT_TIMER,
+    EVENT_TIMER_EXPIRED,
+    EVENT_METRICS
+)
+from .async_engine import AsyncEventEngine
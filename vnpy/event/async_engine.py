@@ -0,0 +1,238 @@
+"""
+Event engine running on one asyncio event loop.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from inspect import isawaitable
+from threading import Thread, get_ident
+from typing import Callable, Coroutine, List
+
+from .engine import Event, EventEngine
+from .timer import Timer
+
+
+class AsyncEventEngine(EventEngine):
+    """
+    Event engine which dispatches events and timers on one asyncio
+    event loop, running in its own thread.
+
+    Handlers can be normal functions or coroutine functions (async def),
+    coroutines are awaited in place so events are still processed in
+    order. Asyncio based gateways can run their coroutines on the same
+    loop with run_coroutine, and put events without cross-thread handoff.
+
+    It provides the same put/register/add_timer surface as EventEngine.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        timer_resolution: float = 0.01,
+        loop: asyncio.AbstractEventLoop = None
+    ):
+        """
+        A new event loop is created if loop not specified.
+        """
+        self._loop: asyncio.AbstractEventLoop = loop or asyncio.new_event_loop()
+        self._loop_thread_id: int = 0
+
+        self._events: deque = deque()
+        self._wakeup: asyncio.Event = None
+        self._waiting: bool = False
+        self._task: asyncio.Task = None
+
+        super().__init__(interval, timer_resolution=timer_resolution)
+
+        self._thread: Thread = Thread(target=self._run_loop)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get asyncio event loop of event engine.
+        """
+        return self._loop
+
+    def _run_loop(self) -> None:
+        """
+        Run event loop until stopped.
+        """
+        self._loop_thread_id = get_ident()
+        asyncio.set_event_loop(self._loop)
+
+        self._task = self._loop.create_task(self._consume())
+        self._loop.run_forever()
+
+    async def _consume(self) -> None:
+        """
+        Drain all available events and then process them in batch.
+        """
+        self._wakeup = asyncio.Event()
+
+        while self._active:
+            self._waiting = True
+            if not self._events:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            self._waiting = False
+
+            events = []
+            while self._events:
+                events.append(self._events.popleft())
+
+            if events:
+                await self._process_batch_async(events)
+
+    async def _process_batch_async(self, events: List[Event]) -> None:
+        """
+        Process events one by one, then distribute events of the same
+        type in one list to batch handlers.
+
+        Exception raised by handler is passed to exception handler of
+        event loop (logged with traceback by default), and does not stop
+        processing of other handlers and events.
+        """
+        for event in events:
+            for handler in self._handlers.get(event.type, []):
+                try:
+                    result = handler(event)
+                    if result is not None and isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._handle_exception(handler, e)
+
+            for handler in self._general_handlers:
+                try:
+                    result = handler(event)
+                    if result is not None and isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._handle_exception(handler, e)
+
+        if not self._batch_handlers:
+            return
+
+        batches = {}
+        for event in events:
+            if event.type in self._batch_handlers:
+                batches.setdefault(event.type, []).append(event)
+
+        for type, batch in batches.items():
+            for handler in self._batch_handlers[type]:
+                try:
+                    result = handler(batch)
+                    if result is not None and isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._handle_exception(handler, e)
+
+    def _handle_exception(self, handler: Callable, e: Exception) -> None:
+        """"""
+        self._loop.call_exception_handler({
+            "message": f"Exception in event handler {handler}",
+            "exception": e,
+        })
+
+    def _schedule_timer(
+        self,
+        timer_id: str,
+        interval: float,
+        callback: Callable[[], None],
+        repeat: bool = True
+    ) -> None:
+        """
+        Add timer which is scheduled by event loop instead of timer wheel.
+        """
+        ticks = round(interval / self._timer_resolution)
+        timer = Timer(timer_id, ticks, callback, repeat)
+
+        with self._timer_condition:
+            self._timers[timer_id] = timer
+
+            # Timers added before start are started by start function
+            if self._active:
+                self._loop.call_soon_threadsafe(self._start_timer, timer)
+
+    def _start_timer(self, timer: Timer) -> None:
+        """
+        Start calling timer callback in event loop.
+        """
+        interval = timer.ticks * self._timer_resolution
+        when = self._loop.time() + interval
+
+        def fire() -> None:
+            """"""
+            nonlocal when
+
+            if not timer.active or not self._active:
+                return
+
+            timer.callback()
+
+            if timer.repeat:
+                when += interval
+                self._loop.call_at(max(when, self._loop.time()), fire)
+            else:
+                timer.active = False
+                self._timers.pop(timer.timer_id, None)
+
+        self._loop.call_at(when, fire)
+
+    def start(self) -> None:
+        """
+        Start event loop thread to process events and timers.
+        """
+        with self._timer_condition:
+            self._active = True
+
+            for timer in self._timers.values():
+                self._loop.call_soon(self._start_timer, timer)
+
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop event engine.
+        """
+        self._active = False
+        self._loop.call_soon_threadsafe(self._shutdown)
+        self._thread.join()
+
+    def _shutdown(self) -> None:
+        """
+        Stop event loop after consumer task finished.
+        """
+        if self._task.done():
+            self._loop.stop()
+            return
+
+        self._task.add_done_callback(lambda task: self._loop.stop())
+        if self._wakeup:
+            self._wakeup.set()
+
+    def put(self, event: Event) -> None:
+        """
+        Put an event object into event queue, thread-safe.
+        """
+        self._events.append(event)
+
+        if not self._waiting:
+            return
+
+        if get_ident() == self._loop_thread_id:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return len(self._events)
+
+    def run_coroutine(self, coro: Coroutine) -> Future:
+        """
+        Run coroutine in event loop, thread-safe.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
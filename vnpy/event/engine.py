@@ -2,13 +2,19 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
-from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from collections import defaultdict, deque
+from queue import Queue
+from itertools import count
+from threading import Condition, Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .metrics import EventMetrics
+from .timer import Timer, TimerWheel
 
 EVENT_TIMER = "eTimer"
+EVENT_TIMER_EXPIRED = "eTimerExpired"
+EVENT_METRICS = "eMetrics"
 
 
 class Event:
@@ -18,15 +24,138 @@ class Event:
     object which contains the real data.
     """
 
+    __slots__ = ("type", "data", "put_time")
+
     def __init__(self, type: str, data: Any = None):
         """"""
         self.type: str = type
         self.data: Any = data
+        self.put_time: float = 0
 
 
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
+# Defines batch handler function which receives a list of events.
+BatchHandlerType = Callable[[List[Event]], None]
+
+
+class EventQueue(Queue):
+    """
+    Event queue which supports draining all available events at once.
+    """
+
+    def get_batch(self, timeout: float = None) -> List[Event]:
+        """
+        Wait until any event is available (or timeout), then remove
+        and return all events in queue within one critical section.
+        """
+        with self.not_empty:
+            if timeout is None:
+                while not self._qsize():
+                    self.not_empty.wait()
+            else:
+                end = monotonic() + timeout
+                while not self._qsize():
+                    remaining = end - monotonic()
+                    if remaining <= 0:
+                        return []
+                    self.not_empty.wait(remaining)
+
+            events = []
+            while self._qsize():
+                events.append(self._get())
+
+            self.not_full.notify_all()
+            return events
+
+
+class ConflatingQueue(EventQueue):
+    """
+    Event queue which keeps only the latest event of each vt_symbol for
+    conflated event types while waiting to be dispatched.
+
+    The latest event replaces the pending one and is moved to the end of
+    queue, so that it is never dispatched ahead of events of other types
+    put before it. Events of other types stay lossless and in order.
+
+    Conflation is counted only for events whose type equals one of the
+    conflated types (e.g. EVENT_TICK), so that tick put again with type
+    of EVENT_TICK + vt_symbol is not counted twice.
+    """
+
+    def __init__(self, types: Sequence[str], maxsize: int = 0):
+        """
+        Types are event type prefixes to be conflated, e.g. EVENT_TICK.
+        """
+        self._types: tuple = tuple(types)
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        """"""
+        # Each slot is a list of [event, key], key is None if not conflated
+        # and event is None if replaced by a later one.
+        self.queue: deque = deque()
+        self._size: int = 0
+
+        self._pending: Dict[tuple, list] = {}
+        self._conflatable: Dict[str, bool] = {}
+        self._counts: defaultdict = defaultdict(int)
+
+    def _qsize(self) -> int:
+        """"""
+        return self._size
+
+    def _put(self, event: Event) -> None:
+        """"""
+        conflatable = self._conflatable.get(event.type, None)
+        if conflatable is None:
+            conflatable = event.type.startswith(self._types)
+            self._conflatable[event.type] = conflatable
+
+        if not conflatable:
+            self.queue.append([event, None])
+            self._size += 1
+            return
+
+        vt_symbol = getattr(event.data, "vt_symbol", "")
+        key = (event.type, vt_symbol)
+
+        slot = self._pending.get(key, None)
+        if slot:
+            slot[0] = None
+            self._size -= 1
+
+            if event.type in self._types:
+                self._counts[vt_symbol] += 1
+
+        slot = [event, key]
+        self._pending[key] = slot
+        self.queue.append(slot)
+        self._size += 1
+
+        # Remove replaced slots once they outnumber pending events
+        if len(self.queue) > self._size * 2 + 64:
+            self.queue = deque(s for s in self.queue if s[0] is not None)
+
+    def _get(self) -> Event:
+        """"""
+        event, key = self.queue.popleft()
+        while event is None:
+            event, key = self.queue.popleft()
+
+        if key:
+            self._pending.pop(key)
+        self._size -= 1
+        return event
+
+    def get_conflation_counts(self) -> Dict[str, int]:
+        """
+        Get number of events conflated of each vt_symbol.
+        """
+        with self.mutex:
+            return dict(self._counts)
+
 
 class EventEngine:
     """
@@ -34,32 +163,106 @@ class EventEngine:
     to those handlers registered.
 
     It also generates timer event by every interval seconds,
-    which can be used for timing purpose.
+    which can be used for timing purpose. Timers with other intervals
+    (sub-second included) or one-shot deadlines can be added with
+    add_timer, all scheduled by one hierarchical timer wheel.
+
+    If metrics enabled, it measures queue wait time, handler execution
+    time, queue size and event rate, and generates metrics event with
+    snapshot of them by every metrics_interval seconds.
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(
+        self,
+        interval: int = 1,
+        conflate_types: Sequence[str] = None,
+        metrics: bool = False,
+        metrics_interval: int = 10,
+        timer_resolution: float = 0.01
+    ):
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        Timers added are scheduled at timer_resolution (in seconds).
+
+        Events with type in conflate_types (e.g. EVENT_TICK) are
+        conflated by vt_symbol when queue backs up, if specified.
         """
         self._interval: int = interval
-        self._queue: Queue = Queue()
+        self._conflate_types: Sequence[str] = conflate_types
+        self._metrics: EventMetrics = EventMetrics() if metrics else None
+        self._queue: EventQueue = self._create_queue()
         self._active: bool = False
         self._thread: Thread = Thread(target=self._run)
         self._timer: Thread = Thread(target=self._run_timer)
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
+        self._batch_handlers: defaultdict = defaultdict(list)
+
+        self._timer_resolution: float = timer_resolution
+        self._timer_wheel: TimerWheel = TimerWheel()
+        self._timer_start: float = 0
+        self._timer_condition: Condition = Condition()
+        self._timer_count = count(1)
+        self._timers: Dict[str, Timer] = {}
+
+        # Handler and repeat flag of each timer added
+        self._timer_handlers: Dict[str, Tuple[HandlerType, bool]] = {}
+        self.register(EVENT_TIMER_EXPIRED, self._process_timer_event)
+
+        self._schedule_timer(EVENT_TIMER, interval, self._put_timer_event)
+        if self._metrics:
+            self._schedule_timer(
+                EVENT_METRICS, metrics_interval, self._put_metrics_event
+            )
+
+    def _create_queue(self) -> EventQueue:
+        """
+        Create event queue, which is conflating if conflate types specified.
+        """
+        if self._conflate_types:
+            return ConflatingQueue(self._conflate_types)
+        return EventQueue()
 
     def _run(self) -> None:
         """
-        Get event from queue and then process it.
+        Get events from queue and then process them.
+        """
+        self._run_queue(self._queue)
+
+    def _run_queue(self, queue: EventQueue) -> None:
+        """
+        Drain all available events from queue and process them in batch.
         """
         while self._active:
-            try:
-                event = self._queue.get(block=True, timeout=1)
-                self._process(event)
-            except Empty:
-                pass
+            events = queue.get_batch(timeout=1)
+            if events:
+                self._process_batch(events)
+
+    def _process_batch(self, events: List[Event]) -> None:
+        """
+        Process events one by one, then distribute events of the same
+        type in one list to batch handlers.
+        """
+        if self._metrics:
+            self._process_batch_metrics(events)
+            return
+
+        for event in events:
+            self._process(event)
+
+        if not self._batch_handlers:
+            return
+
+        batches = defaultdict(list)
+        for event in events:
+            if event.type in self._batch_handlers:
+                batches[event.type].append(event)
+
+        for type, batch in batches.items():
+            for handler in self._batch_handlers[type]:
+                handler(batch)
 
     def _process(self, event: Event) -> None:
         """
@@ -70,19 +273,162 @@ class EventEngine:
         to all types.
         """
         if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
+            for handler in self._handlers[event.type]:
+                handler(event)
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+        for handler in self._general_handlers:
+            handler(event)
+
+    def _process_batch_metrics(self, events: List[Event]) -> None:
+        """
+        Same as _process_batch, but records metrics of each handler call.
+        """
+        metrics = self._metrics
+        metrics.record_batch(events)
+
+        for event in events:
+            handlers = self._handlers.get(event.type, [])
+
+            for handler_list in (handlers, self._general_handlers):
+                for handler in handler_list:
+                    start = perf_counter()
+                    handler(event)
+                    metrics.record_handler(handler, perf_counter() - start)
+
+        if not self._batch_handlers:
+            return
+
+        batches = defaultdict(list)
+        for event in events:
+            if event.type in self._batch_handlers:
+                batches[event.type].append(event)
+
+        for type, batch in batches.items():
+            for handler in self._batch_handlers[type]:
+                start = perf_counter()
+                handler(batch)
+                metrics.record_handler(handler, perf_counter() - start)
 
     def _run_timer(self) -> None:
         """
-        Sleep by interval second(s) and then generate a timer event.
+        Sleep until next timer wheel slot to be processed, then advance
+        wheel to current time and call callbacks of timers expired.
         """
+        wheel = self._timer_wheel
+        resolution = self._timer_resolution
+
+        with self._timer_condition:
+            start = monotonic() - wheel.now * resolution
+            self._timer_start = start
+
         while self._active:
-            sleep(self._interval)
-            event = Event(EVENT_TIMER)
-            self.put(event)
+            with self._timer_condition:
+                deadline = start + (wheel.now + wheel.get_idle_ticks()) * resolution
+                timeout = deadline - monotonic()
+                if timeout > 0:
+                    # Wake up at least every second to check active status
+                    self._timer_condition.wait(min(timeout, 1))
+
+                expired = []
+                target = int((monotonic() - start) / resolution)
+                while wheel.now < target:
+                    expired.extend(wheel.advance())
+
+                for timer in expired:
+                    if timer.repeat:
+                        wheel.add(timer, timer.expire + timer.ticks)
+                    else:
+                        timer.active = False
+                        self._timers.pop(timer.timer_id, None)
+
+            for timer in expired:
+                timer.callback()
+
+    def _schedule_timer(
+        self,
+        timer_id: str,
+        interval: float,
+        callback: Callable[[], None],
+        repeat: bool = True
+    ) -> None:
+        """
+        Add timer into timer wheel, callback is called in timer thread.
+        """
+        ticks = round(interval / self._timer_resolution)
+        timer = Timer(timer_id, ticks, callback, repeat)
+
+        with self._timer_condition:
+            self._timers[timer_id] = timer
+
+            # Wheel is not advanced while timer thread sleeping, so timer
+            # expires from current time instead of time of wheel.
+            now = self._timer_wheel.now
+            if self._timer_start:
+                now = int((monotonic() - self._timer_start) / self._timer_resolution)
+
+            self._timer_wheel.add(timer, now + timer.ticks)
+            self._timer_condition.notify()
+
+    def _put_timer_event(self) -> None:
+        """"""
+        self.put(Event(EVENT_TIMER))
+
+    def _put_metrics_event(self) -> None:
+        """"""
+        self.put(Event(EVENT_METRICS, self.get_metrics()))
+
+    def _process_timer_event(self, event: Event) -> Any:
+        """
+        Call handler of timer expired, one-shot timer is removed first.
+        """
+        timer_id = event.data
+        item = self._timer_handlers.get(timer_id, None)
+
+        # Timer may be removed after event put
+        if not item:
+            return None
+
+        handler, repeat = item
+        if not repeat:
+            self._timer_handlers.pop(timer_id, None)
+
+        return handler(event)
+
+    def add_timer(
+        self,
+        interval: float,
+        handler: HandlerType,
+        repeat: bool = True
+    ) -> str:
+        """
+        Add a timer which expires every interval seconds if repeat,
+        otherwise only once after interval seconds.
+
+        Timer event is generated only when the timer expires, and is
+        processed by handler in event thread just like other events.
+        All timers share event type EVENT_TIMER_EXPIRED with timer id as
+        event data, and timer id is returned.
+        """
+        timer_id = f"{EVENT_TIMER}.{next(self._timer_count)}"
+        self._timer_handlers[timer_id] = (handler, repeat)
+
+        def put_event() -> None:
+            """"""
+            self.put(Event(EVENT_TIMER_EXPIRED, timer_id))
+
+        self._schedule_timer(timer_id, interval, put_event, repeat)
+        return timer_id
+
+    def remove_timer(self, timer_id: str) -> None:
+        """
+        Remove a timer added and its handler.
+        """
+        with self._timer_condition:
+            timer = self._timers.pop(timer_id, None)
+            if timer:
+                timer.active = False
+
+        self._timer_handlers.pop(timer_id, None)
 
     def start(self) -> None:
         """
@@ -97,6 +443,8 @@ class EventEngine:
         Stop event engine.
         """
         self._active = False
+        with self._timer_condition:
+            self._timer_condition.notify()
         self._timer.join()
         self._thread.join()
 
@@ -104,8 +452,32 @@ class EventEngine:
         """
         Put an event object into event queue.
         """
+        if self._metrics:
+            event.put_time = perf_counter()
         self._queue.put(event)
 
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return self._queue.qsize()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get snapshot of metrics, empty if metrics not enabled.
+        """
+        if not self._metrics:
+            return {}
+        return self._metrics.get_snapshot(self.get_queue_size())
+
+    def get_conflation_counts(self) -> Dict[str, int]:
+        """
+        Get number of events conflated of each vt_symbol.
+        """
+        if isinstance(self._queue, ConflatingQueue):
+            return self._queue.get_conflation_counts()
+        return {}
+
     def register(self, type: str, handler: HandlerType) -> None:
         """
         Register a new handler function for a specific event type. Every
@@ -127,6 +499,8 @@ class EventEngine:
         if not handler_list:
             self._handlers.pop(type)
 
+        self._remove_handler_metrics(handler)
+
     def register_general(self, handler: HandlerType) -> None:
         """
         Register a new handler function for all event types. Every
@@ -141,3 +515,218 @@ class EventEngine:
         """
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
+
+        self._remove_handler_metrics(handler)
+
+    def register_batch(self, type: str, handler: BatchHandlerType) -> None:
+        """
+        Register a new batch handler function for a specific event type,
+        which receives all events of the type drained in one dispatch
+        round as a list. Every function can only be registered once for
+        each event type.
+        """
+        handler_list = self._batch_handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister_batch(self, type: str, handler: BatchHandlerType) -> None:
+        """
+        Unregister an existing batch handler function from event engine.
+        """
+        handler_list = self._batch_handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._batch_handlers.pop(type)
+
+        self._remove_handler_metrics(handler)
+
+    def _remove_handler_metrics(self, handler: Callable) -> None:
+        """
+        Remove metrics of handler if it is no longer registered for any
+        event type.
+        """
+        if not self._metrics or handler in self._general_handlers:
+            return
+
+        for handler_lists in (self._handlers, self._batch_handlers):
+            for handler_list in list(handler_lists.values()):
+                if handler in handler_list:
+                    return
+
+        self._metrics.remove_handler(handler)
+
+
+DEFAULT_LANE = "default"
+
+
+class ShardedEventEngine(EventEngine):
+    """
+    Event engine which routes events into several dispatch lanes. Each
+    lane has its own queue and worker thread, so that a burst of events
+    in one lane never delays events in the other lanes.
+
+    Events are routed by the longest matching type prefix in lanes
+    setting, those not matched are put into default lane (timer event
+    included). A lane can be further split into buckets by hash of
+    vt_symbol of event data, so ticks of the same symbol always go
+    into the same bucket.
+
+    Events are processed in order within a lane. Handlers registered
+    for events of several lanes (general handlers included) will be
+    called from different threads, and should be thread-safe.
+
+    e.g.
+        ShardedEventEngine(
+            lanes={
+                "trade": [EVENT_ORDER, EVENT_TRADE],
+                "tick": [EVENT_TICK],
+            },
+            buckets={"tick": 4}
+        )
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        lanes: Dict[str, Sequence[str]] = None,
+        buckets: Dict[str, int] = None,
+        conflate_types: Sequence[str] = None,
+        metrics: bool = False,
+        metrics_interval: int = 10,
+        timer_resolution: float = 0.01
+    ):
+        """
+        Lanes maps lane name to event type prefixes routed into the lane,
+        and buckets maps lane name to number of vt_symbol hash buckets.
+        """
+        super().__init__(
+            interval,
+            conflate_types,
+            metrics,
+            metrics_interval,
+            timer_resolution
+        )
+
+        if not lanes:
+            lanes = {}
+        if not buckets:
+            buckets = {}
+
+        # Default lane uses queue and thread of base engine
+        self._lanes: Dict[str, List[EventQueue]] = {DEFAULT_LANE: [self._queue]}
+        self._threads: List[Thread] = [self._thread]
+
+        self._prefixes: Dict[str, str] = {}
+
+        for name, prefixes in lanes.items():
+            bucket_count = max(buckets.get(name, 1), 1)
+            queues = []
+
+            for i in range(bucket_count):
+                queue = self._create_queue()
+                queues.append(queue)
+
+                thread = Thread(
+                    target=self._run_queue,
+                    args=(queue,),
+                    name=f"{name}.{i}"
+                )
+                self._threads.append(thread)
+
+            self._lanes[name] = queues
+
+            for prefix in prefixes:
+                self._prefixes[prefix] = name
+
+        # Cache lane queues of each event type routed
+        self._routes: Dict[str, List[EventQueue]] = {}
+
+    def _route(self, type: str) -> List[EventQueue]:
+        """
+        Find lane queues of event type by longest prefix match.
+        """
+        matched = ""
+        name = DEFAULT_LANE
+
+        for prefix, lane_name in self._prefixes.items():
+            if type.startswith(prefix) and len(prefix) > len(matched):
+                matched = prefix
+                name = lane_name
+
+        return self._lanes[name]
+
+    def start(self) -> None:
+        """
+        Start all lane threads and timer thread.
+        """
+        self._active = True
+        for thread in self._threads:
+            thread.start()
+        self._timer.start()
+
+    def stop(self) -> None:
+        """
+        Stop event engine.
+        """
+        self._active = False
+        with self._timer_condition:
+            self._timer_condition.notify()
+        self._timer.join()
+        for thread in self._threads:
+            thread.join()
+
+    def put(self, event: Event) -> None:
+        """
+        Put an event object into queue of its lane.
+        """
+        if self._metrics:
+            event.put_time = perf_counter()
+
+        queues = self._routes.get(event.type, None)
+        if queues is None:
+            queues = self._route(event.type)
+            self._routes[event.type] = queues
+
+        if len(queues) == 1:
+            queues[0].put(event)
+        else:
+            vt_symbol = getattr(event.data, "vt_symbol", "")
+            queues[hash(vt_symbol) % len(queues)].put(event)
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in all lanes.
+        """
+        return sum(
+            queue.qsize()
+            for queues in self._lanes.values()
+            for queue in queues
+        )
+
+    def get_lane_sizes(self) -> Dict[str, List[int]]:
+        """
+        Get number of events waiting in each lane.
+        """
+        return {
+            name: [queue.qsize() for queue in queues]
+            for name, queues in self._lanes.items()
+        }
+
+    def get_conflation_counts(self) -> Dict[str, int]:
+        """
+        Get number of events conflated of each vt_symbol in all lanes.
+        """
+        counts = defaultdict(int)
+
+        for queues in self._lanes.values():
+            for queue in queues:
+                if not isinstance(queue, ConflatingQueue):
+                    continue
+
+                for vt_symbol, n in queue.get_conflation_counts().items():
+                    counts[vt_symbol] += n
+
+        return dict(counts)
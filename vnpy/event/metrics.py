@@ -0,0 +1,177 @@
+"""
+Latency and throughput instrumentation of event engine.
+"""
+
+from collections import defaultdict
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+# Upper bound of the largest histogram bucket is 2^24 us (about 16.8 s).
+HISTOGRAM_SIZE = 25
+
+
+class LatencyStat:
+    """
+    Count, total, max and log2 histogram (by microseconds) of latency.
+    """
+
+    __slots__ = ("count", "total", "max", "histogram")
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.histogram: List[int] = [0] * HISTOGRAM_SIZE
+
+    def add(self, seconds: float) -> None:
+        """
+        Add one latency sample in seconds.
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+        index = int(seconds * 1_000_000).bit_length()
+        self.histogram[min(index, HISTOGRAM_SIZE - 1)] += 1
+
+    def merge(self, other: "LatencyStat") -> None:
+        """
+        Add all samples of other stat.
+        """
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+        for i, n in enumerate(other.histogram):
+            self.histogram[i] += n
+
+    def to_dict(self, histogram: bool) -> Dict[str, Any]:
+        """
+        Convert into dict with latency in milliseconds.
+        """
+        d = {
+            "count": self.count,
+            "avg": self.total / self.count * 1000 if self.count else 0,
+            "max": self.max * 1000,
+        }
+
+        # Histogram is keyed by bucket upper bound in microseconds
+        if histogram:
+            d["histogram"] = {
+                1 << i: n for i, n in enumerate(self.histogram) if n
+            }
+
+        return d
+
+
+class EventMetrics:
+    """
+    Collects metrics of event engine:
+        * queue wait time of each event type
+        * execution time histogram of each handler
+        * peak queue size
+        * event count and events per second of each event type
+    """
+
+    def __init__(self):
+        """"""
+        self.lock: Lock = Lock()
+
+        self.waits: Dict[str, LatencyStat] = defaultdict(LatencyStat)
+        self.handlers: Dict[Callable, LatencyStat] = defaultdict(LatencyStat)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+        self.total: int = 0
+        self.peak_size: int = 0
+
+        self.last_time: float = perf_counter()
+        self.last_total: int = 0
+
+    def record_batch(self, events: list) -> None:
+        """
+        Record queue wait time of events drained in one batch. As
+        queue is drained completely every time, batch size is also
+        the queue size just before draining.
+        """
+        now = perf_counter()
+
+        with self.lock:
+            size = len(events)
+            self.total += size
+            if size > self.peak_size:
+                self.peak_size = size
+
+            for event in events:
+                self.counts[event.type] += 1
+
+                put_time = event.put_time
+                if put_time:
+                    self.waits[event.type].add(now - put_time)
+
+    def record_handler(self, handler: Callable, seconds: float) -> None:
+        """
+        Record execution time of handler.
+        """
+        with self.lock:
+            self.handlers[handler].add(seconds)
+
+    def remove_handler(self, handler: Callable) -> None:
+        """
+        Remove execution time stat of handler no longer registered.
+        """
+        with self.lock:
+            self.handlers.pop(handler, None)
+
+    def get_snapshot(self, queue_size: int) -> Dict[str, Any]:
+        """
+        Get snapshot of all metrics, events per second is calculated
+        since last snapshot.
+
+        Handler stats are aggregated by handler name, as the same method
+        of different objects (or closures of the same function) share
+        one name.
+        """
+        now = perf_counter()
+
+        with self.lock:
+            elapsed = now - self.last_time
+            rate = (self.total - self.last_total) / elapsed if elapsed else 0
+
+            self.last_time = now
+            self.last_total = self.total
+
+            handlers: Dict[str, LatencyStat] = defaultdict(LatencyStat)
+            for handler, stat in self.handlers.items():
+                handlers[get_handler_name(handler)].merge(stat)
+
+            return {
+                "queue_size": queue_size,
+                "peak_size": self.peak_size,
+                "event_total": self.total,
+                "event_rate": rate,
+                "event_counts": dict(self.counts),
+                "waits": {
+                    type: stat.to_dict(False)
+                    for type, stat in self.waits.items()
+                },
+                "handlers": {
+                    name: stat.to_dict(True)
+                    for name, stat in handlers.items()
+                },
+            }
+
+
+def get_handler_name(handler: Callable) -> str:
+    """
+    Get readable name of handler function or bound method.
+    """
+    name = getattr(handler, "__qualname__", None)
+    if not name:
+        return repr(handler)
+
+    module = getattr(handler, "__module__", "")
+    return f"{module}.{name}" if module else name
@@ -0,0 +1,130 @@
+"""
+Hierarchical timer wheel used by event engine for scheduling timers.
+"""
+
+from typing import Callable, List
+
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SIZE - 1
+WHEEL_LEVELS = 4
+
+# Timers beyond the range of the whole wheel are put into slot of max
+# delay first, and put into wheel again when the slot expires.
+MAX_DELAY = (1 << (WHEEL_BITS * WHEEL_LEVELS)) - 1
+
+
+class Timer:
+    """
+    Timer scheduled in timer wheel. Callback is called without argument
+    when timer expires, and timer is rescheduled again if repeat.
+    """
+
+    __slots__ = ("timer_id", "ticks", "callback", "repeat", "expire", "slot", "active")
+
+    def __init__(
+        self,
+        timer_id: str,
+        ticks: int,
+        callback: Callable[[], None],
+        repeat: bool = True
+    ):
+        """"""
+        self.timer_id: str = timer_id
+        self.ticks: int = max(ticks, 1)
+        self.callback: Callable[[], None] = callback
+        self.repeat: bool = repeat
+
+        self.expire: int = 0
+        self.slot: int = 0
+        self.active: bool = True
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel with 4 levels of 64 slots each.
+
+    Time is counted in ticks of fixed resolution. Timers expiring in
+    less than 64 ticks are kept in level 0 slots, others are kept in
+    higher levels and cascaded down when lower level wraps around, so
+    that both adding and expiring a timer cost O(1).
+
+    Timer wheel is not thread-safe, caller should hold a lock.
+    """
+
+    def __init__(self):
+        """"""
+        self.now: int = 0
+        self.levels: List[List[List[Timer]]] = [
+            [[] for _ in range(WHEEL_SIZE)] for _ in range(WHEEL_LEVELS)
+        ]
+
+    def add(self, timer: Timer, expire: int) -> None:
+        """
+        Add timer which expires at tick expire (at least next tick).
+        """
+        timer.expire = max(expire, self.now + 1)
+        self._insert(timer)
+
+    def _insert(self, timer: Timer) -> None:
+        """"""
+        delta = min(timer.expire - self.now, MAX_DELAY)
+        timer.slot = self.now + delta
+
+        level = 0
+        while delta >= WHEEL_SIZE:
+            delta >>= WHEEL_BITS
+            level += 1
+
+        index = (timer.slot >> (WHEEL_BITS * level)) & WHEEL_MASK
+        self.levels[level][index].append(timer)
+
+    def advance(self) -> List[Timer]:
+        """
+        Move wheel forward by one tick and return active timers expired.
+        """
+        self.now += 1
+
+        # Cascade timers of higher levels when lower level wraps around
+        for level in range(1, WHEEL_LEVELS):
+            if (self.now >> (WHEEL_BITS * (level - 1))) & WHEEL_MASK:
+                break
+
+            index = (self.now >> (WHEEL_BITS * level)) & WHEEL_MASK
+            slot = self.levels[level][index]
+            self.levels[level][index] = []
+
+            for timer in slot:
+                if timer.active:
+                    self._insert(timer)
+
+        index = self.now & WHEEL_MASK
+        slot = self.levels[0][index]
+        self.levels[0][index] = []
+
+        expired = []
+        for timer in slot:
+            if not timer.active:
+                continue
+
+            # Timer beyond max delay is put into wheel again
+            if timer.expire > self.now:
+                self._insert(timer)
+            else:
+                expired.append(timer)
+
+        return expired
+
+    def get_idle_ticks(self) -> int:
+        """
+        Get number of ticks before wheel needs to be advanced again, which
+        is the next non-empty level 0 slot or next cascade.
+        """
+        level0 = self.levels[0]
+
+        for i in range(1, WHEEL_SIZE + 1):
+            index = (self.now + i) & WHEEL_MASK
+            if not index or level0[index]:
+                return i
+
+        return WHEEL_SIZE
@@ -0,0 +1,412 @@
+"""
+Process level cache of history data loaded from database (or other
+data source), shared by backtesting engines, script engine and strategy
+engines.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+from .constant import Interval
+from .object import (
+    BarData, TickData, DataBatch, BarBatch, TickBatch, EPOCH, to_datetime64
+)
+from .database import database_manager, DB_TZ, convert_tz
+from .setting import SETTINGS
+from .utility import extract_vt_symbol
+
+
+# Key of cache entry (vt_symbol, interval, source), interval is None
+# for tick data
+CacheKey = Tuple[str, Interval, str]
+
+Loader = Callable[..., Union[DataBatch, list]]
+
+MICROSECOND = np.timedelta64(1, "us")
+
+
+class CacheSegment:
+    """
+    Data of one continuous time range [start, end], which is fully
+    loaded from data source (data may still be empty in the range).
+    """
+
+    def __init__(self, start: np.datetime64, end: np.datetime64, batch: DataBatch):
+        """"""
+        self.start: np.datetime64 = start
+        self.end: np.datetime64 = end
+        self.batch: DataBatch = batch
+
+
+class CacheEntry:
+    """
+    Sorted and non-overlapping segments of one key.
+    """
+
+    def __init__(self):
+        """"""
+        self.segments: List[CacheSegment] = []
+        self.nbytes: int = 0
+
+    def get_gaps(
+        self,
+        start: np.datetime64,
+        end: np.datetime64
+    ) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """
+        Get time ranges within [start, end] not covered by segments.
+        """
+        gaps = []
+        current = start
+
+        for segment in self.segments:
+            if segment.end < current:
+                continue
+            if segment.start > end:
+                break
+
+            if segment.start > current:
+                gaps.append((current, segment.start - MICROSECOND))
+            current = segment.end + MICROSECOND
+
+            if current > end:
+                return gaps
+
+        gaps.append((current, end))
+        return gaps
+
+    def get_batch(self, start: np.datetime64, end: np.datetime64) -> DataBatch:
+        """
+        Get data of [start, end] from segment covering it, without copy.
+        """
+        for segment in self.segments:
+            if segment.start <= start and segment.end >= end:
+                return slice_batch(segment.batch, start, end)
+
+    def merge(
+        self,
+        start: np.datetime64,
+        end: np.datetime64,
+        batches: List[DataBatch]
+    ) -> None:
+        """
+        Merge data loaded for gaps of [start, end] with existing segments
+        overlapping or adjacent to it into one segment.
+        """
+        kept = []
+        merged = []
+
+        for segment in self.segments:
+            if segment.end + MICROSECOND < start or segment.start - MICROSECOND > end:
+                kept.append(segment)
+            else:
+                merged.append(segment)
+
+        start = min([start] + [s.start for s in merged])
+        end = max([end] + [s.end for s in merged])
+
+        # Segments and gaps are not overlapping, so that data is sorted
+        # after concatenated in order of time
+        batches = batches + [s.batch for s in merged]
+        batches.sort(key=lambda b: b.data["datetime"][0] if len(b) else start)
+
+        batch = batches[0].new(np.concatenate([b.data for b in batches]))
+
+        # Cached data is shared by all callers, and should not be changed
+        batch.data.flags.writeable = False
+
+        kept.append(CacheSegment(start, end, batch))
+        kept.sort(key=lambda s: s.start)
+
+        self.segments = kept
+        self.nbytes = sum(s.batch.data.nbytes for s in kept)
+
+
+class DataCache:
+    """
+    Cache of bar and tick data keyed by (vt_symbol, interval, source),
+    bounded by total bytes of data arrays with least recently used entry
+    evicted.
+
+    Loaded time ranges of each key are merged, so that any sub-range of
+    them is served from cache, and only ranges not loaded yet are
+    queried from data source.
+
+    Data arrays returned are read-only views of cached data, copy them
+    before changing in place.
+
+    Data after current time may not be complete yet, so it is always
+    loaded from data source and never cached. Cached data is not
+    updated when database is changed, so writers of database should
+    call invalidate after saving or deleting data.
+    """
+
+    def __init__(self, max_bytes: int):
+        """"""
+        self.max_bytes: int = max_bytes
+
+        self.entries: Dict[CacheKey, CacheEntry] = OrderedDict()
+        self.nbytes: int = 0
+        self.lock: Lock = Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+
+    def load_bar_batch(
+        self,
+        vt_symbol: str,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        loader: Loader = None,
+        source: str = "database"
+    ) -> BarBatch:
+        """
+        Get bar data of [start, end] as BarBatch.
+
+        Loader is called with (symbol, exchange, interval, start, end)
+        for ranges not cached, and should return BarBatch or list of
+        BarData. Default loader is load_bar_array of database, source
+        name should be given for any other loader.
+        """
+        if not loader:
+            loader = database_manager.load_bar_array
+
+        symbol, exchange = extract_vt_symbol(vt_symbol)
+
+        def load(start: datetime, end: datetime) -> BarBatch:
+            data = loader(symbol, exchange, interval, start, end)
+            if isinstance(data, BarBatch):
+                return data
+
+            batch = BarBatch(symbol, exchange, interval, gateway_name="DB", tz=DB_TZ)
+            if data:
+                batch.data = BarBatch.create_array(data)
+            return batch
+
+        return self.get((vt_symbol, interval, source), start, end, load)
+
+    def load_bar_data(
+        self,
+        vt_symbol: str,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        loader: Loader = None,
+        source: str = "database"
+    ) -> List[BarData]:
+        """
+        Get bar data of [start, end] as list of BarData.
+        """
+        batch = self.load_bar_batch(vt_symbol, interval, start, end, loader, source)
+        return batch.to_bars()
+
+    def load_tick_batch(
+        self,
+        vt_symbol: str,
+        start: datetime,
+        end: datetime,
+        loader: Loader = None,
+        source: str = "database"
+    ) -> TickBatch:
+        """
+        Get tick data of [start, end] as TickBatch.
+
+        Loader is called with (symbol, exchange, start, end) and should
+        return TickBatch or list of TickData. Default loader is
+        load_tick_array of database.
+        """
+        if not loader:
+            loader = database_manager.load_tick_array
+
+        symbol, exchange = extract_vt_symbol(vt_symbol)
+
+        def load(start: datetime, end: datetime) -> TickBatch:
+            data = loader(symbol, exchange, start, end)
+            if isinstance(data, TickBatch):
+                return data
+
+            batch = TickBatch(symbol, exchange, gateway_name="DB", tz=DB_TZ)
+            if data:
+                batch.data = TickBatch.create_array(data)
+                batch.name = data[0].name
+            return batch
+
+        return self.get((vt_symbol, None, source), start, end, load)
+
+    def load_tick_data(
+        self,
+        vt_symbol: str,
+        start: datetime,
+        end: datetime,
+        loader: Loader = None,
+        source: str = "database"
+    ) -> List[TickData]:
+        """
+        Get tick data of [start, end] as list of TickData.
+        """
+        batch = self.load_tick_batch(vt_symbol, start, end, loader, source)
+        return batch.to_ticks()
+
+    def get(
+        self,
+        key: CacheKey,
+        start: datetime,
+        end: datetime,
+        load: Callable[[datetime, datetime], DataBatch]
+    ) -> DataBatch:
+        """
+        Get data of [start, end] from cache, loading ranges not cached.
+        """
+        start = to_datetime64(start)
+        end = to_datetime64(end)
+
+        now = to_datetime64(datetime.now(timezone.utc))
+        if end < now:
+            return self.get_cached(key, start, end, load)
+
+        # Data after now is loaded without cache
+        live_start = max(start, now)
+        live = slice_batch(load(to_datetime(live_start), to_datetime(end)), live_start, end)
+        if start >= now:
+            return live
+
+        batch = self.get_cached(key, start, now - MICROSECOND, load)
+        return batch.new(np.concatenate([batch.data, live.data]))
+
+    def get_cached(
+        self,
+        key: CacheKey,
+        start: np.datetime64,
+        end: np.datetime64,
+        load: Callable[[datetime, datetime], DataBatch]
+    ) -> DataBatch:
+        """
+        Get data of [start, end] from cache, loading ranges not cached.
+        """
+        if start > end:
+            return slice_batch(load(to_datetime(start), to_datetime(end)), start, end)
+
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry:
+                self.entries.move_to_end(key)
+            else:
+                entry = CacheEntry()
+                self.entries[key] = entry
+
+            gaps = entry.get_gaps(start, end)
+            if not gaps:
+                self.hits += 1
+                return entry.get_batch(start, end)
+
+            self.misses += 1
+            self.loads += len(gaps)
+
+        # Load data of each gap without lock, so that loading of other keys
+        # is not blocked, and drop data out of range returned by data
+        # source (e.g. loaded by whole day)
+        batches = [
+            slice_batch(load(to_datetime(gap_start), to_datetime(gap_end)), gap_start, gap_end)
+            for gap_start, gap_end in gaps
+        ]
+        loaded = batches[0].new(np.concatenate([b.data for b in batches]))
+
+        with self.lock:
+            # Entry invalidated or evicted while loading is not cached
+            cached = self.entries.get(key, None) is entry
+
+            # Part of gaps may be loaded by other thread in the meantime
+            batches = [
+                slice_batch(loaded, gap_start, gap_end)
+                for gap_start, gap_end in entry.get_gaps(start, end)
+            ]
+
+            if batches:
+                if cached:
+                    self.nbytes -= entry.nbytes
+                entry.merge(start, end, batches)
+                if cached:
+                    self.nbytes += entry.nbytes
+                    self.evict()
+
+            return entry.get_batch(start, end)
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until within byte budget, the
+        most recently used entry is always kept.
+        """
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.nbytes -= entry.nbytes
+            self.evictions += 1
+
+    def invalidate(
+        self,
+        vt_symbol: str,
+        interval: Interval = None,
+        source: str = "database"
+    ) -> None:
+        """
+        Remove cached data of vt_symbol and interval (None for tick data)
+        after data source is changed.
+        """
+        with self.lock:
+            entry = self.entries.pop((vt_symbol, interval, source), None)
+            if entry:
+                self.nbytes -= entry.nbytes
+
+    def clear(self) -> None:
+        """
+        Remove all cached data.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get snapshot of cache metrics.
+        """
+        with self.lock:
+            requests = self.hits + self.misses
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def slice_batch(batch: DataBatch, start: np.datetime64, end: np.datetime64) -> DataBatch:
+    """
+    Get sub-batch within [start, end] by binary search, without copy.
+    """
+    dts = batch.data["datetime"]
+    ix_start = np.searchsorted(dts, start, "left")
+    ix_end = np.searchsorted(dts, end, "right")
+    return batch.new(batch.data[ix_start:ix_end])
+
+
+def to_datetime(dt: np.datetime64) -> datetime:
+    """
+    Convert UTC datetime64 into naive datetime of DB_TZ, which is the
+    same as datetime passed to database by backtesting engines.
+    """
+    dt = EPOCH + timedelta(microseconds=int(dt.astype("int64")))
+    return convert_tz(dt)
+
+
+data_cache: DataCache = DataCache(SETTINGS["database.cache_size"] * 1024 * 1024)
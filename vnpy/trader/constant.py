@@ -157,3 +157,14 @@ class Interval(Enum):
     DAILY = "d"
     WEEKLY = "w"
     TICK = "tick"
+
+
+class BarType(Enum):
+    """
+    Type of bar generated from tick data.
+    """
+    TIME = "time"
+    SECOND = "second"
+    VOLUME = "volume"
+    TURNOVER = "turnover"
+    TICK = "tick"
@@ -1,16 +1,23 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import List
-from pytz import timezone
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Sequence
 from dataclasses import dataclass
 from importlib import import_module
 
+import numpy as np
+
 from .constant import Interval, Exchange
-from .object import BarData, TickData
-from .setting import SETTINGS
+from .object import BarData, TickData, BarBatch, TickBatch
+from .setting import SETTINGS, DB_TZ
+
+# Default number of rows of each chunk yielded by iterators
+CHUNK_SIZE = 10_000
 
+# Days of each window loaded by default iterator implementation
+BAR_WINDOW_DAYS = 30
+TICK_WINDOW_DAYS = 1
 
-DB_TZ = timezone(SETTINGS["database.timezone"])
+MICROSECOND = timedelta(microseconds=1)
 
 
 def convert_tz(dt: datetime) -> datetime:
@@ -21,6 +28,80 @@ def convert_tz(dt: datetime) -> datetime:
     return dt.replace(tzinfo=None)
 
 
+def convert_datetime64(dts: np.ndarray) -> np.ndarray:
+    """
+    Convert naive datetime64 array of DB_TZ into UTC datetime64[us].
+    """
+    dts = dts.astype("datetime64[us]")
+    if not len(dts):
+        return dts
+
+    # UTC offset only changes on whole hours, so get it once per hour
+    hours, inverse = np.unique(dts.astype("datetime64[h]"), return_inverse=True)
+    offsets = np.array(
+        [DB_TZ.utcoffset(h) // timedelta(microseconds=1) for h in hours.tolist()],
+        dtype="timedelta64[us]"
+    )
+    return dts - offsets[inverse]
+
+
+def create_data_array(rows: Sequence[tuple], dtype: np.dtype) -> np.ndarray:
+    """
+    Create structured array from database rows, each of which contains
+    naive datetime (object or string) of DB_TZ followed by all number
+    fields in the same order as dtype.
+    """
+    data = np.empty(len(rows), dtype=dtype)
+    if not len(rows):
+        return data
+
+    columns = list(zip(*rows))
+    data["datetime"] = convert_datetime64(np.array(columns[0], dtype="datetime64[us]"))
+
+    # None of empty tick depth fields is converted into nan
+    for name, column in zip(dtype.names[1:], columns[1:]):
+        data[name] = np.array(column, dtype=float)
+
+    return data
+
+
+def get_unique_index(dts: np.ndarray) -> np.ndarray:
+    """
+    Get index sorting datetime array, with only the last one of each
+    same datetime kept.
+    """
+    index = np.argsort(dts, kind="stable")
+    sorted_dts = dts[index]
+
+    last = np.ones(len(index), dtype=bool)
+    last[:-1] = sorted_dts[1:] != sorted_dts[:-1]
+    return index[last]
+
+
+def rechunk(arrays: Iterable[np.ndarray], chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Regroup rows of arrays in order into chunks of chunk_size rows, only
+    the last chunk may be smaller. Chunk within one array is not copied.
+    """
+    buffer = []
+    count = 0
+
+    for data in arrays:
+        while len(data):
+            n = min(chunk_size - count, len(data))
+            buffer.append(data[:n])
+            count += n
+            data = data[n:]
+
+            if count == chunk_size:
+                yield buffer[0] if len(buffer) == 1 else np.concatenate(buffer)
+                buffer = []
+                count = 0
+
+    if count:
+        yield buffer[0] if len(buffer) == 1 else np.concatenate(buffer)
+
+
 @dataclass
 class BarOverview:
     """
@@ -81,6 +162,130 @@ class BaseDatabase(ABC):
         """
         pass
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """
+        Load bar data from database into columnar BarBatch.
+
+        Drivers should override this to read rows straight from cursor,
+        the default implementation converts result of load_bar_data.
+        """
+        bars = self.load_bar_data(symbol, exchange, interval, start, end)
+
+        batch = BarBatch(symbol, exchange, interval, gateway_name="DB", tz=DB_TZ)
+        if bars:
+            batch.data = BarBatch.create_array(bars)
+        return batch
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """
+        Load tick data from database into columnar TickBatch.
+
+        Drivers should override this to read rows straight from cursor,
+        the default implementation converts result of load_tick_data.
+        """
+        ticks = self.load_tick_data(symbol, exchange, start, end)
+
+        batch = TickBatch(symbol, exchange, gateway_name="DB", tz=DB_TZ)
+        if ticks:
+            batch.data = TickBatch.create_array(ticks)
+            batch.name = ticks[0].name
+        return batch
+
+    def iter_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[BarBatch]:
+        """
+        Load bar data from database as BarBatch chunks of chunk_size rows
+        in order of time, so that data of long period can be processed
+        with constant memory.
+
+        Drivers should override this to read chunks from cursor, the
+        default implementation loads data by windows of 30 days.
+        """
+        def load(start: datetime, end: datetime) -> np.ndarray:
+            return self.load_bar_array(symbol, exchange, interval, start, end).data
+
+        arrays = iter_windows(load, start, end, timedelta(days=BAR_WINDOW_DAYS))
+        for data in rechunk(arrays, chunk_size):
+            yield BarBatch(symbol, exchange, interval, data, "DB", DB_TZ)
+
+    def iter_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[TickBatch]:
+        """
+        Load tick data from database as TickBatch chunks of chunk_size rows
+        in order of time.
+
+        Drivers should override this to read chunks from cursor, the
+        default implementation loads data by windows of 1 day.
+        """
+        name = ""
+
+        def load(start: datetime, end: datetime) -> np.ndarray:
+            nonlocal name
+            batch = self.load_tick_array(symbol, exchange, start, end)
+            name = name or batch.name
+            return batch.data
+
+        arrays = iter_windows(load, start, end, timedelta(days=TICK_WINDOW_DAYS))
+        for data in rechunk(arrays, chunk_size):
+            yield TickBatch(symbol, exchange, data, "DB", DB_TZ, name)
+
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """
+        Load bar data from database as lists of chunk_size bars in order
+        of time.
+        """
+        for batch in self.iter_bar_array(symbol, exchange, interval, start, end, chunk_size):
+            yield batch.to_bars()
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """
+        Load tick data from database as lists of chunk_size ticks in order
+        of time.
+        """
+        for batch in self.iter_tick_array(symbol, exchange, start, end, chunk_size):
+            yield batch.to_ticks()
+
     @abstractmethod
     def delete_bar_data(
         self,
@@ -112,6 +317,21 @@ class BaseDatabase(ABC):
         pass
 
 
+def iter_windows(
+    load: Callable[[datetime, datetime], np.ndarray],
+    start: datetime,
+    end: datetime,
+    window: timedelta
+) -> Iterator[np.ndarray]:
+    """
+    Load data of [start, end] by consecutive windows of time.
+    """
+    while start <= end:
+        window_end = min(start + window - MICROSECOND, end)
+        yield load(start, window_end)
+        start = window_end + MICROSECOND
+
+
 driver: str = SETTINGS["database.driver"]
 module_name: str = f"vnpy.database.{driver}"
 try:
@@ -0,0 +1,289 @@
+"""
+Market data hub sharing bar generation and indicators across strategies.
+"""
+
+import traceback
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from vnpy.event import Event, EventEngine
+
+from .constant import Interval
+from .engine import BaseEngine, MainEngine
+from .event import EVENT_TICK
+from .object import BarData, TickData
+from .utility import ArrayManager, BarGenerator
+
+
+FeedKey = Tuple[str, Interval, int]
+
+
+class BarFeed:
+    """
+    One BarGenerator and ArrayManager shared by all subscribers of the
+    same (vt_symbol, interval, window).
+
+    Window 0 means 1 minute bars generated from tick data. Array manager
+    is updated before bar callbacks of subscribers are called, so that
+    indicators are calculated (and cached) only once for all of them.
+
+    History bars should be loaded by load_history, which is done only by
+    the first subscriber, so that bars are not duplicated in array
+    manager and callbacks of existing subscribers are not called.
+
+    Exception raised by one callback is written to log by write_log, and
+    does not stop other callbacks.
+    """
+
+    def __init__(
+        self,
+        vt_symbol: str,
+        write_log: Callable[[str], None],
+        interval: Interval = Interval.MINUTE,
+        window: int = 0,
+        size: int = 100
+    ):
+        """"""
+        self.vt_symbol: str = vt_symbol
+        self.interval: Interval = interval
+        self.window: int = window
+        self.write_log: Callable[[str], None] = write_log
+
+        if window:
+            self.bg: BarGenerator = BarGenerator(
+                self.on_bar, window, self.on_window_bar, interval
+            )
+        else:
+            self.bg: BarGenerator = BarGenerator(self.on_bar)
+
+        self.am: ArrayManager = ArrayManager(size)
+
+        # Guards updating and enlarging array manager from different threads
+        self.am_lock: Lock = Lock()
+
+        # Replaced instead of modified, so it can be iterated without lock
+        self.callbacks: List[Callable[[BarData], None]] = []
+
+        # History is loaded only once, without calling callbacks
+        self.inited: bool = False
+        self.loading: bool = False
+        self.history_lock: Lock = Lock()
+
+    def process_tick_event(self, event: Event) -> None:
+        """"""
+        self.bg.update_tick(event.data)
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Update tick data.
+        """
+        self.bg.update_tick(tick)
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update 1 minute bar data.
+        """
+        if self.window:
+            self.bg.update_bar(bar)
+        else:
+            self.on_window_bar(bar)
+
+    def load_history(self, bars: Iterable[BarData]) -> bool:
+        """
+        Update 1 minute history bars into array manager without calling
+        callbacks, if feed is not inited yet. Return if history is loaded
+        by this call.
+
+        It should be called after subscribed and before live bars are
+        generated, e.g. in on_init of strategy.
+        """
+        with self.history_lock:
+            if self.inited:
+                return False
+
+            self.loading = True
+            try:
+                for bar in bars:
+                    self.update_bar(bar)
+            finally:
+                self.loading = False
+
+            self.inited = True
+            return True
+
+    def on_bar(self, bar: BarData) -> None:
+        """"""
+        self.update_bar(bar)
+
+    def on_window_bar(self, bar: BarData) -> None:
+        """"""
+        with self.am_lock:
+            self.am.update_bar(bar)
+
+        if self.loading:
+            return
+
+        for callback in self.callbacks:
+            try:
+                callback(bar)
+            except Exception:
+                msg = f"{self.vt_symbol}回调函数{callback}触发异常\n{traceback.format_exc()}"
+                self.write_log(msg)
+
+    def add_callback(self, callback: Callable[[BarData], None]) -> None:
+        """"""
+        self.callbacks = self.callbacks + [callback]
+
+    def remove_callback(self, callback: Callable[[BarData], None]) -> None:
+        """"""
+        callbacks = list(self.callbacks)
+        if callback in callbacks:
+            callbacks.remove(callback)
+        self.callbacks = callbacks
+
+    def resize(self, size: int) -> None:
+        """
+        Enlarge array manager to size, existing data is kept.
+
+        Copy and swap are done under lock, so that bar updated by event
+        thread in the meantime is not lost.
+        """
+        with self.am_lock:
+            old = self.am
+            if size <= old.size:
+                return
+
+            am = ArrayManager(size, old.cache_size)
+            am.count = old.count
+            am.inited = old.count >= size
+            am.indicators = old.indicators
+
+            # Put existing data at the end of new ring buffer and its mirror
+            data = old.buffer[:, old.start:old.start + old.size]
+            am.buffer[:, size - old.size:size] = data
+            am.buffer[:, size * 2 - old.size:] = data
+
+            self.am = am
+
+
+class MarketDataHub(BaseEngine):
+    """
+    Process level hub of bar feeds. Each feed is created by its first
+    subscriber and removed after its last subscriber unsubscribed.
+
+    Tick data is received from event engine only by 1 minute bar feed
+    of each vt_symbol, and x minute/hour bar feeds are updated with bars
+    of 1 minute feed, so that each tick is aggregated only once.
+
+    Subscribers should access array manager by feed.am when bar callback
+    is called, which may be enlarged by later subscriber, and warm up by
+    feed.load_history.
+    """
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
+        """"""
+        super().__init__(main_engine, event_engine, "hub")
+
+        self.feeds: Dict[FeedKey, BarFeed] = {}
+        self.lock: Lock = Lock()
+
+    def subscribe(
+        self,
+        vt_symbol: str,
+        callback: Callable[[BarData], None],
+        interval: Interval = Interval.MINUTE,
+        window: int = 0,
+        size: int = 100
+    ) -> BarFeed:
+        """
+        Subscribe bar callback of (vt_symbol, interval, window) and return
+        the shared feed.
+        """
+        with self.lock:
+            return self.add_callback(vt_symbol, callback, interval, window, size)
+
+    def unsubscribe(
+        self,
+        vt_symbol: str,
+        callback: Callable[[BarData], None],
+        interval: Interval = Interval.MINUTE,
+        window: int = 0
+    ) -> None:
+        """
+        Unsubscribe bar callback, and remove feed if no more subscriber.
+        """
+        with self.lock:
+            self.remove_callback(vt_symbol, callback, interval, window)
+
+    def add_callback(
+        self,
+        vt_symbol: str,
+        callback: Callable[[BarData], None],
+        interval: Interval,
+        window: int,
+        size: int
+    ) -> BarFeed:
+        """"""
+        key = (vt_symbol, interval, window)
+        feed = self.feeds.get(key, None)
+
+        if not feed:
+            feed = BarFeed(vt_symbol, self.write_log, interval, window, size)
+            self.feeds[key] = feed
+
+            # Array manager of 1 minute feed is only enlarged when
+            # subscribed directly
+            if window:
+                self.add_callback(
+                    vt_symbol, feed.update_bar, Interval.MINUTE, 0, 1
+                )
+            else:
+                self.event_engine.register(
+                    EVENT_TICK + vt_symbol, feed.process_tick_event
+                )
+        else:
+            feed.resize(size)
+
+        feed.add_callback(callback)
+        return feed
+
+    def remove_callback(
+        self,
+        vt_symbol: str,
+        callback: Callable[[BarData], None],
+        interval: Interval,
+        window: int
+    ) -> None:
+        """"""
+        key = (vt_symbol, interval, window)
+        feed = self.feeds.get(key, None)
+        if not feed:
+            return
+
+        feed.remove_callback(callback)
+        if feed.callbacks:
+            return
+
+        self.feeds.pop(key)
+
+        if window:
+            self.remove_callback(vt_symbol, feed.update_bar, Interval.MINUTE, 0)
+        else:
+            self.event_engine.unregister(
+                EVENT_TICK + vt_symbol, feed.process_tick_event
+            )
+
+    def write_log(self, msg: str) -> None:
+        """"""
+        self.main_engine.write_log(msg, "MarketDataHub")
+
+    def get_feed(
+        self,
+        vt_symbol: str,
+        interval: Interval = Interval.MINUTE,
+        window: int = 0
+    ) -> BarFeed:
+        """
+        Get feed of (vt_symbol, interval, window) if subscribed.
+        """
+        return self.feeds.get((vt_symbol, interval, window), None)
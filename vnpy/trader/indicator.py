@@ -0,0 +1,416 @@
+"""
+Incremental technical indicators updated in O(1) per new bar.
+
+Values are the same as calculated by talib over the whole bar history,
+and are nan before indicator is inited.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from math import nan, sqrt
+from typing import Deque
+
+from .object import BarData
+
+
+class Indicator(ABC):
+    """
+    Base class of incremental indicator, which can be attached to
+    ArrayManager with add_indicator to get updated with every new bar.
+    """
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.inited: bool = False
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update new bar data into indicator.
+        """
+        self.update(bar.close_price)
+
+    @abstractmethod
+    def update(self, value: float) -> None:
+        """
+        Update new close price into indicator.
+        """
+        pass
+
+
+class SmaIndicator(Indicator):
+    """
+    Simple moving average.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.values: Deque[float] = deque()
+        self.total: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        self.values.append(value)
+        self.total += value
+
+        if len(self.values) > self.n:
+            self.total -= self.values.popleft()
+
+        if self.count >= self.n:
+            self.inited = True
+            self.value = self.total / self.n
+
+
+class EmaIndicator(Indicator):
+    """
+    Exponential moving average, seeded with SMA of first n values.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.k: float = 2 / (n + 1)
+        self.total: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.inited:
+            self.value += (value - self.value) * self.k
+        else:
+            self.total += value
+
+            if self.count == self.n:
+                self.inited = True
+                self.value = self.total / self.n
+
+
+class RsiIndicator(Indicator):
+    """
+    Relative Strenght Index (RSI) with Wilder's smoothing.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.last_close: float = nan
+        self.avg_gain: float = 0
+        self.avg_loss: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        last_close = self.last_close
+        self.last_close = value
+
+        if self.count == 1:
+            return
+
+        change = value - last_close
+        gain = change if change > 0 else 0
+        loss = -change if change < 0 else 0
+
+        n = self.n
+        if self.inited:
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+        else:
+            self.avg_gain += gain
+            self.avg_loss += loss
+
+            if self.count <= n:
+                return
+
+            self.inited = True
+            self.avg_gain /= n
+            self.avg_loss /= n
+
+        total = self.avg_gain + self.avg_loss
+        self.value = 100 * self.avg_gain / total if total else 0
+
+
+class AtrIndicator(Indicator):
+    """
+    Average True Range (ATR) with Wilder's smoothing.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.last_close: float = nan
+        self.total: float = 0
+        self.value: float = nan
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.high_price, bar.low_price, bar.close_price)
+
+    def update(self, high: float, low: float, close: float) -> None:
+        """"""
+        self.count += 1
+
+        last_close = self.last_close
+        self.last_close = close
+
+        if self.count == 1:
+            return
+
+        tr = max(high, last_close) - min(low, last_close)
+
+        n = self.n
+        if self.inited:
+            self.value = (self.value * (n - 1) + tr) / n
+        else:
+            self.total += tr
+
+            if self.count > n:
+                self.inited = True
+                self.value = self.total / n
+
+
+class BollIndicator(Indicator):
+    """
+    Bollinger Channel of SMA and population standard deviation.
+
+    Sums of window values are taken around a shift value close to mean,
+    so that variance does not cancel badly for high price with small
+    moves. Shift and sums are recalculated from window every n bars, so
+    that rounding error does not drift, which is still O(1) per bar on
+    average.
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.dev: float = dev
+
+        self.values: Deque[float] = deque(maxlen=n)
+        self.shift: float = 0
+        self.total: float = 0
+        self.total_square: float = 0
+
+        self.mid: float = nan
+        self.up: float = nan
+        self.down: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        values = self.values
+        shift = self.shift
+
+        if len(values) == self.n:
+            d = values[0] - shift
+            self.total -= d
+            self.total_square -= d * d
+
+        values.append(value)
+        d = value - shift
+        self.total += d
+        self.total_square += d * d
+
+        if self.count < self.n:
+            return
+        self.inited = True
+
+        if not self.count % self.n:
+            self.rebase()
+
+        mean = self.total / self.n
+        variance = max(self.total_square / self.n - mean * mean, 0)
+        std = sqrt(variance)
+
+        self.mid = self.shift + mean
+        self.up = self.mid + std * self.dev
+        self.down = self.mid - std * self.dev
+
+    def rebase(self) -> None:
+        """
+        Recalculate sums around mean of current window.
+        """
+        shift = sum(self.values) / self.n
+
+        self.shift = shift
+        self.total = 0
+        self.total_square = 0
+
+        for v in self.values:
+            d = v - shift
+            self.total += d
+            self.total_square += d * d
+
+
+class MacdIndicator(Indicator):
+    """
+    MACD, both fast and slow EMA start from the slow_period-th value.
+    """
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        """"""
+        super().__init__()
+
+        # Same as talib, fast period should be smaller than slow period
+        if slow_period < fast_period:
+            fast_period, slow_period = slow_period, fast_period
+
+        self.fast_period: int = fast_period
+        self.slow_period: int = slow_period
+
+        self.closes: Deque[float] = deque(maxlen=slow_period)
+        self.fast_k: float = 2 / (fast_period + 1)
+        self.slow_k: float = 2 / (slow_period + 1)
+        self.fast_ema: float = nan
+        self.slow_ema: float = nan
+
+        self.signal_ema: EmaIndicator = EmaIndicator(signal_period)
+
+        self.macd: float = nan
+        self.signal: float = nan
+        self.hist: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.count < self.slow_period:
+            self.closes.append(value)
+            return
+        elif self.count == self.slow_period:
+            self.closes.append(value)
+
+            fast_closes = list(self.closes)[-self.fast_period:]
+            self.fast_ema = sum(fast_closes) / self.fast_period
+            self.slow_ema = sum(self.closes) / self.slow_period
+
+            self.closes.clear()
+        else:
+            self.fast_ema += (value - self.fast_ema) * self.fast_k
+            self.slow_ema += (value - self.slow_ema) * self.slow_k
+
+        macd = self.fast_ema - self.slow_ema
+        self.signal_ema.update(macd)
+
+        if not self.signal_ema.inited:
+            return
+        self.inited = True
+
+        self.macd = macd
+        self.signal = self.signal_ema.value
+        self.hist = macd - self.signal
+
+
+class DonchianIndicator(Indicator):
+    """
+    Donchian Channel, using monotonic queues of highs and lows.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+
+        # Queues of (index, price), price is decreasing in highs
+        # and increasing in lows
+        self.highs: Deque[tuple] = deque()
+        self.lows: Deque[tuple] = deque()
+
+        self.up: float = nan
+        self.down: float = nan
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.high_price, bar.low_price)
+
+    def update(self, high: float, low: float) -> None:
+        """"""
+        self.count += 1
+        count = self.count
+
+        highs = self.highs
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((count, high))
+        if highs[0][0] <= count - self.n:
+            highs.popleft()
+
+        lows = self.lows
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((count, low))
+        if lows[0][0] <= count - self.n:
+            lows.popleft()
+
+        if count >= self.n:
+            self.inited = True
+            self.up = highs[0][1]
+            self.down = lows[0][1]
+
+
+class KamaIndicator(Indicator):
+    """
+    Kaufman Adaptive Moving Average (KAMA) with fast period 2 and slow
+    period 30.
+    """
+
+    FAST_K = 2 / (2 + 1)
+    SLOW_K = 2 / (30 + 1)
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.closes: Deque[float] = deque(maxlen=n + 1)
+        self.volatility: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        closes = self.closes
+        if closes:
+            self.volatility += abs(value - closes[-1])
+
+        # Remove oldest change from volatility when window is full
+        if len(closes) == self.n + 1:
+            self.volatility -= abs(closes[1] - closes[0])
+
+        closes.append(value)
+
+        if self.count <= self.n:
+            return
+
+        direction = value - closes[0]
+        if self.volatility <= direction or not self.volatility:
+            er = 1
+        else:
+            er = abs(direction / self.volatility)
+
+        sc = (er * (self.FAST_K - self.SLOW_K) + self.SLOW_K) ** 2
+
+        if not self.inited:
+            self.inited = True
+            self.value = closes[-2]
+
+        self.value += (value - self.value) * sc
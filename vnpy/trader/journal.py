@@ -0,0 +1,324 @@
+"""
+Binary event journal for recording and replaying events.
+"""
+
+import mmap
+import pickle
+import struct
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Thread
+from time import monotonic_ns, sleep, time_ns
+from typing import Generator, Iterator, List, Sequence, Tuple
+
+from vnpy.event import Event, EventEngine, EVENT_TIMER, EVENT_METRICS
+
+from .engine import BaseEngine, MainEngine
+from .utility import get_folder_path
+
+
+JOURNAL_MAGIC = b"VNJ2"
+
+# File header: magic + start time of recording session in epoch seconds
+FILE_HEADER = struct.Struct("<4sI")
+HEADER_SIZE = 8
+
+# Record header: payload length (uint32) + epoch time in ns (uint64)
+RECORD_HEADER = struct.Struct("<IQ")
+
+
+class EventJournal(BaseEngine):
+    """
+    Records every event flowing through event engine into memory-mapped
+    binary journal files, which can be replayed by JournalReplayer.
+
+    Events are serialized by the general handler, so that data changed
+    later is recorded as it was when dispatched. They are then put into
+    a bounded queue and written by a separate thread, so that dispatch
+    thread is never blocked by file writing. Events are dropped (and
+    counted) if queue is full.
+
+    Journal files are rotated when reaching file_size, and only the
+    latest max_files files are kept (all files are kept if 0).
+    """
+
+    def __init__(
+        self,
+        main_engine: MainEngine,
+        event_engine: EventEngine,
+        folder_name: str = "journal",
+        file_size: int = 64 * 1024 * 1024,
+        max_files: int = 20,
+        queue_size: int = 100000,
+        ignore_types: Sequence[str] = (EVENT_TIMER, EVENT_METRICS)
+    ):
+        """"""
+        super().__init__(main_engine, event_engine, "journal")
+
+        self.folder_path: Path = get_folder_path(folder_name)
+        self.file_size: int = file_size
+        self.max_files: int = max_files
+        self.ignore_types: tuple = tuple(ignore_types)
+
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.thread: Thread = Thread(target=self.run)
+        self.active: bool = False
+
+        self.file = None
+        self.mmap: mmap.mmap = None
+        self.pos: int = 0
+        self.file_count: int = 0
+        self.session: int = time_ns() // 1_000_000_000
+
+        self.dropped: int = 0
+        self.errors: int = 0
+
+        self.start()
+        self.event_engine.register_general(self.process_event)
+
+    def process_event(self, event: Event) -> None:
+        """"""
+        if event.type.startswith(self.ignore_types):
+            return
+
+        try:
+            payload = pickle.dumps((event.type, event.data), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            self.errors += 1
+            return
+
+        try:
+            self.queue.put_nowait((time_ns(), payload))
+        except Full:
+            self.dropped += 1
+
+    def run(self) -> None:
+        """"""
+        while self.active:
+            try:
+                record = self.queue.get(block=True, timeout=1)
+            except Empty:
+                continue
+
+            self.write_record(*record)
+
+            # Drain all records available before next blocking get
+            while True:
+                try:
+                    record = self.queue.get_nowait()
+                except Empty:
+                    break
+                self.write_record(*record)
+
+        self.close_file()
+
+    def write_record(self, timestamp: int, payload: bytes) -> None:
+        """
+        Append serialized event into current journal file.
+        """
+        size = RECORD_HEADER.size + len(payload)
+
+        if not self.mmap or self.pos + size > len(self.mmap):
+            self.open_file(size)
+
+        RECORD_HEADER.pack_into(self.mmap, self.pos, len(payload), timestamp)
+        self.pos += RECORD_HEADER.size
+        self.mmap[self.pos:self.pos + len(payload)] = payload
+        self.pos += len(payload)
+
+    def open_file(self, min_size: int) -> None:
+        """
+        Close current file and open a new one, then remove old files.
+        """
+        self.close_file()
+
+        self.file_count += 1
+        dt = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = self.folder_path.joinpath(f"{dt}_{self.file_count:06d}.vnj")
+
+        size = max(self.file_size, HEADER_SIZE + min_size)
+        self.file = open(file_path, "w+b")
+        self.file.truncate(size)
+
+        self.mmap = mmap.mmap(self.file.fileno(), size)
+        FILE_HEADER.pack_into(self.mmap, 0, JOURNAL_MAGIC, self.session)
+        self.pos = HEADER_SIZE
+
+        if not self.max_files:
+            return
+
+        file_paths = get_journal_files(self.folder_path)
+        for path in file_paths[:-self.max_files]:
+            path.unlink()
+
+    def close_file(self) -> None:
+        """
+        Flush current file and truncate unused space.
+        """
+        if not self.mmap:
+            return
+
+        self.mmap.flush()
+        self.mmap.close()
+        self.mmap = None
+
+        self.file.truncate(self.pos)
+        self.file.close()
+        self.file = None
+
+    def start(self) -> None:
+        """"""
+        self.active = True
+        self.thread.start()
+
+    def close(self) -> None:
+        """"""
+        if not self.active:
+            return
+
+        self.event_engine.unregister_general(self.process_event)
+
+        self.active = False
+        self.thread.join()
+
+
+class JournalReplayer:
+    """
+    Reads events from journal files and feeds them into event engine.
+
+    File with incomplete record at the end (e.g. left by crash) is read
+    until the record, and (file path, offset of record) is added into
+    truncated.
+    """
+
+    def __init__(self, folder_name: str = "journal"):
+        """"""
+        self.folder_path: Path = get_folder_path(folder_name)
+        self.truncated: List[Tuple[Path, int]] = []
+
+    def load(self) -> Iterator[Tuple[int, Event]]:
+        """
+        Iterate (epoch time in ns, event) of all journal files in order.
+        """
+        for _, timestamp, event in self.load_sessions():
+            yield timestamp, event
+
+    def load_sessions(self) -> Iterator[Tuple[int, int, Event]]:
+        """
+        Iterate (session, epoch time in ns, event) of all journal files
+        in order, session is start time of recording in epoch seconds.
+        """
+        self.truncated = []
+
+        for file_path in get_journal_files(self.folder_path):
+            session = read_journal_session(file_path)
+            records = read_journal_file(file_path)
+
+            while True:
+                try:
+                    timestamp, event = next(records)
+                except StopIteration as e:
+                    if e.value:
+                        self.truncated.append((file_path, e.value))
+                    break
+
+                yield session, timestamp, event
+
+    def replay(self, main_engine: MainEngine, speed: float = 0) -> int:
+        """
+        Put events into event engine of main engine, and return number
+        of events replayed.
+
+        Events are replayed at full speed if speed is 0, otherwise at
+        recorded pace multiplied by speed. Pace is restarted at each
+        recording session, so that time between sessions (e.g. process
+        stopped) is skipped.
+        """
+        event_engine = main_engine.event_engine
+
+        count = 0
+        last_session = None
+        first_timestamp = 0
+        start = 0
+
+        for session, timestamp, event in self.load_sessions():
+            if speed:
+                if session != last_session:
+                    last_session = session
+                    first_timestamp = timestamp
+                    start = monotonic_ns()
+
+                target = start + (timestamp - first_timestamp) / speed
+                wait = (target - monotonic_ns()) / 1_000_000_000
+                if wait > 0:
+                    sleep(wait)
+
+            event_engine.put(event)
+            count += 1
+
+        for file_path, offset in self.truncated:
+            main_engine.write_log(f"事件日志文件{file_path.name}在{offset}字节处记录不完整，已停止读取")
+
+        return count
+
+
+def get_journal_files(folder_path: Path) -> List[Path]:
+    """
+    Get journal files in folder sorted by creation order.
+    """
+    return sorted(folder_path.glob("*.vnj"))
+
+
+def read_journal_session(file_path: Path) -> int:
+    """
+    Get start time of recording session of journal file.
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+
+    if len(header) < HEADER_SIZE:
+        return 0
+    return FILE_HEADER.unpack(header)[1]
+
+
+def read_journal_file(file_path: Path) -> Generator[Tuple[int, Event], None, int]:
+    """
+    Iterate (epoch time in ns, event) recorded in one journal file.
+
+    Reading stops at the first record which is incomplete or cannot be
+    decoded, and its offset is returned by generator (0 if none).
+    """
+    with open(file_path, "rb") as f:
+        size = f.seek(0, 2)
+        if size <= HEADER_SIZE:
+            return 0
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if m[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+                return 0
+
+            pos = HEADER_SIZE
+            while pos + RECORD_HEADER.size <= size:
+                length, timestamp = RECORD_HEADER.unpack_from(m, pos)
+                if not length:
+                    return 0
+
+                start = pos + RECORD_HEADER.size
+                end = start + length
+                if end > size:
+                    return pos
+
+                try:
+                    type, data = pickle.loads(m[start:end])
+                except Exception:
+                    return pos
+
+                pos = end
+                yield timestamp, Event(type, data)
+
+            # Only part of record header is written, while unused space
+            # left by rotation is all zero
+            if any(m[pos:size]):
+                return pos
+            return 0
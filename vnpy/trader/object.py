@@ -2,9 +2,17 @@
 Basic data structure used for general trading function in VN Trader.
 """
 
-from dataclasses import dataclass
-from datetime import datetime
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields, make_dataclass
+from datetime import datetime, timedelta, tzinfo
 from logging import INFO
+from operator import attrgetter
+from threading import Lock
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+from pytz import timezone, utc
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
 
@@ -413,3 +421,494 @@ class QuoteRequest:
             gateway_name=gateway_name,
         )
         return quote
+
+
+# Timezone used by gateways for datetime of market data, which is also
+# used for datetime built from timestamp of compact data.
+CHINA_TZ = timezone("Asia/Shanghai")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=utc)
+
+
+vt_symbols: Dict[Tuple[str, Exchange], str] = {}
+
+
+def get_vt_symbol(symbol: str, exchange: Exchange) -> str:
+    """
+    Get vt_symbol string, which is cached so that all data objects of
+    the same symbol share one string object.
+    """
+    key = (symbol, exchange)
+
+    vt_symbol = vt_symbols.get(key, None)
+    if not vt_symbol:
+        vt_symbol = sys.intern(f"{symbol}.{exchange.value}")
+        vt_symbols[key] = vt_symbol
+
+    return vt_symbol
+
+
+symbol_ids: Dict[str, int] = {}
+symbol_names: List[str] = []
+symbol_lock: Lock = Lock()
+
+
+def get_symbol_id(vt_symbol: str) -> int:
+    """
+    Get small integer id of vt_symbol from process-wide registry, which
+    can be used as array index or dict key instead of string.
+    """
+    symbol_id = symbol_ids.get(vt_symbol, None)
+    if symbol_id is not None:
+        return symbol_id
+
+    with symbol_lock:
+        symbol_id = symbol_ids.get(vt_symbol, None)
+        if symbol_id is None:
+            symbol_id = len(symbol_names)
+            symbol_names.append(vt_symbol)
+            symbol_ids[vt_symbol] = symbol_id
+
+    return symbol_id
+
+
+def get_symbol_name(symbol_id: int) -> str:
+    """
+    Get vt_symbol of integer id registered.
+    """
+    return symbol_names[symbol_id]
+
+
+def to_timestamp(dt: datetime) -> int:
+    """
+    Convert datetime into epoch nanoseconds, naive datetime is treated
+    as time of DB_TZ.
+    """
+    if not dt.tzinfo:
+        dt = localize(dt)
+    return int(dt.timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+
+def localize(dt: datetime) -> datetime:
+    """
+    Convert naive datetime into aware datetime of DB_TZ, which is the
+    convention of database drivers.
+    """
+    # Imported here as setting imports utility, which imports this module
+    from .setting import DB_TZ
+    return DB_TZ.localize(dt)
+
+
+def _get_datetime(self) -> datetime:
+    """
+    Get datetime, which is built from timestamp on first access.
+    """
+    dt = self._datetime
+    if dt is None and self._timestamp:
+        dt = datetime.fromtimestamp(self._timestamp / 1_000_000_000, self.timezone)
+        self._datetime = dt
+    return dt
+
+
+def _set_datetime(self, dt: datetime) -> None:
+    """"""
+    self._datetime = dt
+    self._timestamp = 0
+
+
+def _get_timestamp(self) -> int:
+    """
+    Get epoch nanoseconds, which is calculated from datetime on first access.
+    """
+    ts = self._timestamp
+    if not ts and self._datetime is not None:
+        ts = to_timestamp(self._datetime)
+        self._timestamp = ts
+    return ts
+
+
+def _set_timestamp(self, ts: int) -> None:
+    """"""
+    if ts:
+        self._timestamp = ts
+        self._datetime = None
+
+
+def make_compact(
+    cls: type,
+    extra_slots: Sequence[str],
+    post_init: Callable,
+    timestamp: bool = False
+) -> type:
+    """
+    Create a memory-compact copy of data class, which uses __slots__
+    instead of per-instance __dict__, with the same fields and methods.
+
+    If timestamp is True, an optional timestamp field (epoch nanoseconds)
+    is added after other fields. Datetime and timestamp are then built
+    lazily from each other on first access, and setting one of them
+    discards the other.
+    """
+    name = cls.__name__
+    module = cls.__module__
+
+    if timestamp:
+        cls = make_dataclass(name, [("timestamp", int, 0)], bases=(cls,))
+
+    names = [f.name for f in fields(cls)]
+
+    namespace = {}
+    for klass in reversed(cls.__mro__[:-1]):
+        namespace.update(klass.__dict__)
+
+    for n in names + ["__dict__", "__weakref__"]:
+        namespace.pop(n, None)
+
+    slots = names + list(extra_slots)
+
+    if timestamp:
+        slots.remove("datetime")
+        slots.remove("timestamp")
+        slots.extend(["_datetime", "_timestamp"])
+
+        namespace["datetime"] = property(_get_datetime, _set_datetime)
+        namespace["timestamp"] = property(_get_timestamp, _set_timestamp)
+        namespace["timezone"] = CHINA_TZ
+
+    namespace["__slots__"] = tuple(slots)
+    namespace["__post_init__"] = post_init
+    namespace["__qualname__"] = namespace["__name__"] = f"Compact{name}"
+    namespace["__module__"] = module
+
+    return type(f"Compact{name}", (), namespace)
+
+
+def _post_init_tick_bar(self) -> None:
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+
+
+def _post_init_order(self) -> None:
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+    self.vt_orderid = sys.intern(f"{self.gateway_name}.{self.orderid}")
+
+
+def _post_init_trade(self) -> None:
+    """"""
+    self.vt_symbol = get_vt_symbol(self.symbol, self.exchange)
+    self.vt_orderid = sys.intern(f"{self.gateway_name}.{self.orderid}")
+    self.vt_tradeid = f"{self.gateway_name}.{self.tradeid}"
+
+
+# Memory-compact variants for hot path, which have the same fields and
+# methods as original data classes, but without per-instance __dict__.
+# Compact tick/bar data also supports numeric timestamp, whose timezone
+# for building datetime can be changed with class attribute timezone.
+CompactTickData = make_compact(
+    TickData, ["vt_symbol"], _post_init_tick_bar, True
+)
+CompactBarData = make_compact(
+    BarData, ["vt_symbol"], _post_init_tick_bar, True
+)
+CompactOrderData = make_compact(
+    OrderData, ["vt_symbol", "vt_orderid"], _post_init_order
+)
+CompactTradeData = make_compact(
+    TradeData, ["vt_symbol", "vt_orderid", "vt_tradeid"], _post_init_trade
+)
+
+
+BAR_FIELDS: List[str] = [
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_FIELDS: List[str] = [
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+] + [
+    f"{side}_{kind}_{i}"
+    for side in ["bid", "ask"]
+    for kind in ["price", "volume"]
+    for i in range(1, 6)
+]
+
+# Datetime is stored as UTC timestamp in microseconds.
+BAR_DTYPE = np.dtype([("datetime", "datetime64[us]")] + [(f, "f8") for f in BAR_FIELDS])
+TICK_DTYPE = np.dtype([("datetime", "datetime64[us]")] + [(f, "f8") for f in TICK_FIELDS])
+
+
+def to_datetime64(dt: datetime) -> np.datetime64:
+    """
+    Convert datetime into UTC datetime64, naive datetime is treated as
+    time of DB_TZ.
+    """
+    if not dt.tzinfo:
+        dt = localize(dt)
+    return np.datetime64((dt - EPOCH) // timedelta(microseconds=1), "us")
+
+
+class DataBatch(ABC):
+    """
+    Columnar container of time series data of one symbol, backed by a
+    NumPy structured array sorted by datetime.
+
+    Each field can be accessed as an array (e.g. batch["close_price"]),
+    and slicing (by index or by time) returns a new batch sharing the
+    same memory without copy.
+    """
+
+    dtype: np.dtype = None
+    fields: List[str] = []
+    data_class: type = None
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: np.ndarray,
+        gateway_name: str = "",
+        tz: tzinfo = None
+    ):
+        """"""
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.data: np.ndarray = data
+        self.gateway_name: str = gateway_name
+        self.tz: tzinfo = tz
+
+        self.vt_symbol: str = get_vt_symbol(symbol, exchange)
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.data)
+
+    def __getitem__(self, key: Union[int, slice, str]):
+        """
+        Get data object by index, sub-batch by slice, or field array by name.
+        """
+        if isinstance(key, str):
+            return self.data[key]
+        elif isinstance(key, slice):
+            return self.new(self.data[key])
+        else:
+            return self.to_list(self.data[key:key + 1 or None])[0]
+
+    def __iter__(self):
+        """"""
+        return iter(self.to_list())
+
+    @abstractmethod
+    def new(self, data: np.ndarray) -> "DataBatch":
+        """
+        Create batch of the same symbol with new data array.
+        """
+        pass
+
+    def slice_time(self, start: datetime = None, end: datetime = None) -> "DataBatch":
+        """
+        Get sub-batch within [start, end] by binary search, without copy.
+        """
+        dts = self.data["datetime"]
+        ix_start = np.searchsorted(dts, to_datetime64(start), "left") if start else 0
+        ix_end = np.searchsorted(dts, to_datetime64(end), "right") if end else len(dts)
+        return self.new(self.data[ix_start:ix_end])
+
+    def to_list(self, data: np.ndarray = None) -> list:
+        """
+        Convert into list of data objects.
+        """
+        if data is None:
+            data = self.data
+
+        timestamps = data["datetime"].astype("int64").tolist()
+        columns = [data[f].tolist() for f in self.fields]
+
+        kwargs = {
+            "symbol": self.symbol,
+            "exchange": self.exchange,
+            "gateway_name": self.gateway_name,
+        }
+        kwargs.update(self.get_extra_kwargs())
+
+        objs = []
+        for ts, values in zip(timestamps, zip(*columns)):
+            obj = self.data_class(
+                datetime=datetime.fromtimestamp(ts / 1_000_000, self.tz),
+                **kwargs,
+                **dict(zip(self.fields, values))
+            )
+            objs.append(obj)
+
+        return objs
+
+    def get_extra_kwargs(self) -> dict:
+        """
+        Get extra arguments for creating data objects.
+        """
+        return {}
+
+    @classmethod
+    def create_array(cls, objs: list) -> np.ndarray:
+        """
+        Create structured array from list of data objects.
+        """
+        data = np.empty(len(objs), dtype=cls.dtype)
+        if not objs:
+            return data
+
+        data["datetime"] = [
+            round(obj.datetime.timestamp() * 1_000_000) for obj in objs
+        ]
+
+        # Read all fields of each object at once, then assign by column
+        values = np.array(list(map(attrgetter(*cls.fields), objs)), dtype=float)
+        for i, f in enumerate(cls.fields):
+            data[f] = values[:, i]
+
+        return data
+
+    # Defined after other methods to avoid shadowing datetime in annotations
+    @property
+    def datetime(self) -> np.ndarray:
+        """
+        Get UTC datetime64 array.
+        """
+        return self.data["datetime"]
+
+
+class BarBatch(DataBatch):
+    """
+    Columnar container of bar data of one symbol and interval.
+    """
+
+    dtype: np.dtype = BAR_DTYPE
+    fields: List[str] = BAR_FIELDS
+    data_class: type = BarData
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        data: np.ndarray = None,
+        gateway_name: str = "",
+        tz: tzinfo = None
+    ):
+        """"""
+        if data is None:
+            data = np.empty(0, dtype=BAR_DTYPE)
+
+        super().__init__(symbol, exchange, data, gateway_name, tz)
+        self.interval: Interval = interval
+
+    def new(self, data: np.ndarray) -> "BarBatch":
+        """"""
+        return BarBatch(
+            self.symbol,
+            self.exchange,
+            self.interval,
+            data,
+            self.gateway_name,
+            self.tz
+        )
+
+    def get_extra_kwargs(self) -> dict:
+        """"""
+        return {"interval": self.interval}
+
+    def to_bars(self) -> List[BarData]:
+        """
+        Convert into list of BarData.
+        """
+        return self.to_list()
+
+    @classmethod
+    def from_bars(cls, bars: List[BarData]) -> "BarBatch":
+        """
+        Create batch from list of BarData (at least one bar).
+        """
+        bar = bars[0]
+        return BarBatch(
+            bar.symbol,
+            bar.exchange,
+            bar.interval,
+            cls.create_array(bars),
+            bar.gateway_name,
+            bar.datetime.tzinfo
+        )
+
+
+class TickBatch(DataBatch):
+    """
+    Columnar container of tick data of one symbol.
+    """
+
+    dtype: np.dtype = TICK_DTYPE
+    fields: List[str] = TICK_FIELDS
+    data_class: type = TickData
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: np.ndarray = None,
+        gateway_name: str = "",
+        tz: tzinfo = None,
+        name: str = ""
+    ):
+        """"""
+        if data is None:
+            data = np.empty(0, dtype=TICK_DTYPE)
+
+        super().__init__(symbol, exchange, data, gateway_name, tz)
+        self.name: str = name
+
+    def new(self, data: np.ndarray) -> "TickBatch":
+        """"""
+        return TickBatch(
+            self.symbol,
+            self.exchange,
+            data,
+            self.gateway_name,
+            self.tz,
+            self.name
+        )
+
+    def get_extra_kwargs(self) -> dict:
+        """"""
+        return {"name": self.name}
+
+    def to_ticks(self) -> List[TickData]:
+        """
+        Convert into list of TickData.
+        """
+        return self.to_list()
+
+    @classmethod
+    def from_ticks(cls, ticks: List[TickData]) -> "TickBatch":
+        """
+        Create batch from list of TickData (at least one tick).
+        """
+        tick = ticks[0]
+        return TickBatch(
+            tick.symbol,
+            tick.exchange,
+            cls.create_array(ticks),
+            tick.gateway_name,
+            tick.datetime.tzinfo,
+            tick.name
+        )
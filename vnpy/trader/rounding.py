@@ -0,0 +1,228 @@
+"""
+Fast rounding of price and volume to integer number of ticks.
+
+Results are identical to rounding with Decimal(str(value)) as done by
+round_to, floor_to and ceil_to, while Decimal is only used for the rare
+values whose float quotient is too close to a rounding boundary.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from math import ceil, floor
+from typing import Callable
+
+import numpy as np
+
+from .object import ContractData
+
+
+# Quotients closer than this (relative) to a rounding boundary are
+# rounded with Decimal, float error of quotient is far below it.
+TOLERANCE = 1e-9
+
+# Integers below this can be multiplied in float64 without error.
+MAX_EXACT = 2 ** 53
+
+
+class TickRounder:
+    """
+    Rounds value to integer multiple of tick. Tick is precomputed into
+    integer tick_units / scale, so that result is calculated as a
+    correctly rounded division of two exact integers.
+    """
+
+    def __init__(self, tick: float):
+        """"""
+        self.tick: float = tick
+        self.tick_decimal: Decimal = Decimal(str(tick))
+
+        exponent = self.tick_decimal.as_tuple().exponent
+        digits = max(-exponent, 0)
+
+        self.scale: int = 10 ** digits
+        self.tick_units: int = int(self.tick_decimal * self.scale)
+
+    def to_ticks(self, value: float) -> int:
+        """
+        Get nearest number of ticks (round half to even).
+        """
+        q = value / self.tick
+        n = round(q)
+
+        if abs(abs(q - int(q)) - 0.5) <= abs(q) * TOLERANCE + TOLERANCE:
+            n = int(round(Decimal(str(value)) / self.tick_decimal))
+        return n
+
+    def floor_ticks(self, value: float) -> int:
+        """
+        Get number of ticks rounded down.
+        """
+        q = value / self.tick
+        n = floor(q)
+
+        if abs(q - round(q)) <= abs(q) * TOLERANCE + TOLERANCE:
+            n = int(floor(Decimal(str(value)) / self.tick_decimal))
+        return n
+
+    def ceil_ticks(self, value: float) -> int:
+        """
+        Get number of ticks rounded up.
+        """
+        q = value / self.tick
+        n = ceil(q)
+
+        if abs(q - round(q)) <= abs(q) * TOLERANCE + TOLERANCE:
+            n = int(ceil(Decimal(str(value)) / self.tick_decimal))
+        return n
+
+    def from_ticks(self, n: int) -> float:
+        """
+        Convert number of ticks into value.
+        """
+        return n * self.tick_units / self.scale
+
+    def round(self, value: float) -> float:
+        """
+        Same as round_to(value, tick).
+        """
+        return self.to_ticks(value) * self.tick_units / self.scale
+
+    def floor(self, value: float) -> float:
+        """
+        Same as floor_to(value, tick).
+        """
+        return self.floor_ticks(value) * self.tick_units / self.scale
+
+    def ceil(self, value: float) -> float:
+        """
+        Same as ceil_to(value, tick).
+        """
+        return self.ceil_ticks(value) * self.tick_units / self.scale
+
+    def to_ticks_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Get nearest numbers of ticks of array (round half to even).
+        """
+        q = np.asarray(values, dtype=float) / self.tick
+        n = np.rint(q)
+
+        frac = np.abs(q - np.trunc(q))
+        mask = np.abs(frac - 0.5) <= np.abs(q) * TOLERANCE + TOLERANCE
+        return self.fix_array(values, n, mask, self.to_ticks)
+
+    def floor_ticks_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Get numbers of ticks of array rounded down.
+        """
+        q = np.asarray(values, dtype=float) / self.tick
+        n = np.floor(q)
+
+        mask = np.abs(q - np.rint(q)) <= np.abs(q) * TOLERANCE + TOLERANCE
+        return self.fix_array(values, n, mask, self.floor_ticks)
+
+    def ceil_ticks_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Get numbers of ticks of array rounded up.
+        """
+        q = np.asarray(values, dtype=float) / self.tick
+        n = np.ceil(q)
+
+        mask = np.abs(q - np.rint(q)) <= np.abs(q) * TOLERANCE + TOLERANCE
+        return self.fix_array(values, n, mask, self.ceil_ticks)
+
+    def fix_array(
+        self,
+        values: np.ndarray,
+        n: np.ndarray,
+        mask: np.ndarray,
+        func: Callable[[float], int]
+    ) -> np.ndarray:
+        """
+        Recalculate numbers of ticks of values close to rounding boundary.
+        """
+        indexes = np.flatnonzero(mask)
+        if len(indexes):
+            values = np.asarray(values, dtype=float).ravel()
+            n = n.copy()
+            flat = n.reshape(-1)
+            for i in indexes.tolist():
+                flat[i] = func(values[i])
+        return n
+
+    def from_ticks_array(self, n: np.ndarray) -> np.ndarray:
+        """
+        Convert numbers of ticks array into values.
+        """
+        return n * self.tick_units / self.scale
+
+    def round_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Round array of values to tick.
+        """
+        values = np.asarray(values, dtype=float)
+        n = self.to_ticks_array(values)
+        return self.get_values(values, n, self.round)
+
+    def floor_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Round down array of values to tick.
+        """
+        values = np.asarray(values, dtype=float)
+        n = self.floor_ticks_array(values)
+        return self.get_values(values, n, self.floor)
+
+    def ceil_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Round up array of values to tick.
+        """
+        values = np.asarray(values, dtype=float)
+        n = self.ceil_ticks_array(values)
+        return self.get_values(values, n, self.ceil)
+
+    def get_values(
+        self,
+        values: np.ndarray,
+        n: np.ndarray,
+        func: Callable[[float], float]
+    ) -> np.ndarray:
+        """
+        Convert numbers of ticks into values, fall back to scalar function
+        if number of tick units cannot be represented exactly in float64.
+        """
+        units = n * self.tick_units
+
+        if np.any(np.abs(units) >= MAX_EXACT):
+            result = [func(v) for v in values.ravel().tolist()]
+            return np.array(result).reshape(values.shape)
+
+        return units / self.scale
+
+
+class ContractRounder:
+    """
+    Price and volume rounders of one contract, precomputed from its
+    pricetick and min_volume.
+    """
+
+    def __init__(self, contract: ContractData):
+        """"""
+        self.vt_symbol: str = contract.vt_symbol
+
+        self.price: TickRounder = get_rounder(contract.pricetick)
+        self.volume: TickRounder = get_rounder(contract.min_volume)
+
+    def round_price(self, price: float) -> float:
+        """"""
+        return self.price.round(price)
+
+    def round_volume(self, volume: float) -> float:
+        """"""
+        return self.volume.floor(volume)
+
+
+@lru_cache(maxsize=1024)
+def get_rounder(tick: float) -> TickRounder:
+    """
+    Get cached rounder of tick.
+    """
+    return TickRounder(tick)
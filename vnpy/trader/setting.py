@@ -4,6 +4,7 @@ Global setting of VN Trader.
 
 from logging import CRITICAL
 from typing import Dict, Any
+from pytz import timezone
 from tzlocal import get_localzone
 
 from .utility import load_json
@@ -35,6 +36,8 @@ SETTINGS: Dict[str, Any] = {
     "database.user": "root",
     "database.password": "",
     "database.authentication_source": "admin",  # for mongodb
+    "database.cache_size": 512,                 # MB of history data cache
+    "database.sqlite_wal": False,               # WAL journal for sqlite
 
     "genus.parent_host": "",
     "genus.parent_port": "",
@@ -50,6 +53,10 @@ SETTINGS: Dict[str, Any] = {
 SETTING_FILENAME: str = "vt_setting.json"
 SETTINGS.update(load_json(SETTING_FILENAME))
 
+# Timezone of datetime saved in database, naive datetime is also treated
+# as time of this timezone.
+DB_TZ = timezone(SETTINGS["database.timezone"])
+
 
 def get_settings(prefix: str = "") -> Dict[str, Any]:
     prefix_length = len(prefix)
@@ -5,20 +5,40 @@ General utility functions.
 import json
 import logging
 import sys
+import warnings
+from datetime import datetime, timedelta, tzinfo
 from pathlib import Path
-from typing import Callable, Dict, Tuple, Union, Optional
-from decimal import Decimal
-from math import floor, ceil
+from typing import Any, Callable, Dict, List, Tuple, Union, Optional
+from functools import wraps
+from time import monotonic
+from operator import attrgetter
 
 import numpy as np
 import talib
 
-from .object import BarData, TickData
-from .constant import Exchange, Interval
+from vnpy.event import Event, EventEngine
+
+from .object import (
+    BarData,
+    TickData,
+    CompactBarData,
+    CompactTickData,
+    DataBatch,
+    BarBatch,
+    TickBatch,
+    BAR_FIELDS
+)
+from .event import EVENT_TICK
+from .indicator import Indicator
+from .rounding import get_rounder
+from .constant import BarType, Exchange, Interval
 
 
 log_formatter = logging.Formatter('[%(asctime)s] %(message)s')
 
+MINUTE = timedelta(minutes=1)
+MINUTE_NS = 60_000_000_000
+
 
 def extract_vt_symbol(vt_symbol: str) -> Tuple[str, Exchange]:
     """
@@ -121,30 +141,21 @@ def round_to(value: float, target: float) -> float:
     """
     Round price to price tick value.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    rounded = float(int(round(value / target)) * target)
-    return rounded
+    return get_rounder(target).round(value)
 
 
 def floor_to(value: float, target: float) -> float:
     """
     Similar to math.floor function, but to target float number.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    result = float(int(floor(value / target)) * target)
-    return result
+    return get_rounder(target).floor(value)
 
 
 def ceil_to(value: float, target: float) -> float:
     """
     Similar to math.ceil function, but to target float number.
     """
-    value = Decimal(str(value))
-    target = Decimal(str(target))
-    result = float(int(ceil(value / target)) * target)
-    return result
+    return get_rounder(target).ceil(value)
 
 
 def get_digits(value: float) -> int:
@@ -163,6 +174,16 @@ def get_digits(value: float) -> int:
         return 0
 
 
+def get_bar_class(data: Union[TickData, BarData]) -> type:
+    """
+    Get bar class to be generated from data, compact bar is generated
+    from compact tick/bar data.
+    """
+    if isinstance(data, (CompactTickData, CompactBarData)):
+        return CompactBarData
+    return BarData
+
+
 class BarGenerator:
     """
     For:
@@ -172,6 +193,13 @@ class BarGenerator:
     Notice:
     1. for x minute bar, x must be able to divide 60: 2, 3, 5, 6, 10, 15, 20, 30
     2. for x hour bar, x can be any number
+    3. compact bar data is generated if input data is compact
+    4. other bar types can be generated from tick data with bar_size:
+        * SECOND: bar of every bar_size seconds
+        * VOLUME: bar finished when volume reaches bar_size
+        * TURNOVER: bar finished when turnover (volume * price) reaches bar_size
+        * TICK: bar of every bar_size ticks
+    and x window bar is generated from every x bars of them.
     """
 
     def __init__(
@@ -179,12 +207,20 @@ class BarGenerator:
         on_bar: Callable,
         window: int = 0,
         on_window_bar: Callable = None,
-        interval: Interval = Interval.MINUTE
+        interval: Interval = Interval.MINUTE,
+        bar_type: BarType = BarType.TIME,
+        bar_size: float = 0
     ):
         """Constructor"""
         self.bar: BarData = None
         self.on_bar: Callable = on_bar
 
+        self.bar_type: BarType = bar_type
+        self.bar_size: float = bar_size
+        self.bar_ticks: int = 0
+        self.bar_turnover: float = 0
+        self.bar_second: float = 0
+
         self.interval: Interval = interval
         self.interval_count: int = 0
 
@@ -197,9 +233,34 @@ class BarGenerator:
         self.last_tick: TickData = None
         self.last_bar: BarData = None
 
+        # Integer time of last tick and current bar, for compact tick data
+        self.last_timestamp: int = 0
+        self.bar_minute: int = 0
+
+        # Timer of event engine for closing bar at end of bar period
+        self.event_engine: EventEngine = None
+        self.grace: float = 0
+        self.timer_id: str = ""
+        self.closed_end: Any = None
+
+        self.close_type: str = ""
+        self.close_pending: bool = False
+
+        # End of current bar in tick time form and in seconds since epoch
+        self.bar_end: Any = None
+        self.bar_end_time: float = 0
+
+        # Time of last tick in seconds since epoch, and monotonic time
+        # when it was received
+        self.data_time: float = 0
+        self.data_received: float = 0
+
     def update_tick(self, tick: TickData) -> None:
         """
         Update new tick data into generator.
+
+        For compact tick data, integer timestamp is used for filtering
+        and minute bucketing instead of datetime.
         """
         new_minute = False
 
@@ -207,29 +268,55 @@ class BarGenerator:
         if not tick.last_price:
             return
 
-        # Filter tick data with older timestamp
-        if self.last_tick and tick.datetime < self.last_tick.datetime:
+        if self.bar_type != BarType.TIME:
+            self.update_tick_bar_type(tick)
             return
 
+        compact = isinstance(tick, CompactTickData)
+
+        # Filter tick data with older timestamp
+        if compact:
+            timestamp = tick.timestamp
+            if timestamp < self.last_timestamp:
+                return
+
+            minute = timestamp // MINUTE_NS
+            changed = minute != self.bar_minute
+
+            # Filter tick data of bar already closed by timer
+            if self.closed_end and timestamp < self.closed_end:
+                return
+        else:
+            if self.last_tick and tick.datetime < self.last_tick.datetime:
+                return
+
+            if self.closed_end and tick.datetime < self.closed_end:
+                return
+
+            changed = self.bar and (
+                (self.bar.datetime.minute != tick.datetime.minute)
+                or (self.bar.datetime.hour != tick.datetime.hour)
+            )
+
         if not self.bar:
             new_minute = True
-        elif (
-            (self.bar.datetime.minute != tick.datetime.minute)
-            or (self.bar.datetime.hour != tick.datetime.hour)
-        ):
-            self.bar.datetime = self.bar.datetime.replace(
-                second=0, microsecond=0
-            )
+        elif changed:
+            if compact:
+                self.bar.timestamp = self.bar_minute * MINUTE_NS
+            else:
+                self.bar.datetime = self.bar.datetime.replace(
+                    second=0, microsecond=0
+                )
             self.on_bar(self.bar)
 
             new_minute = True
 
         if new_minute:
-            self.bar = BarData(
+            self.bar = get_bar_class(tick)(
                 symbol=tick.symbol,
                 exchange=tick.exchange,
                 interval=Interval.MINUTE,
-                datetime=tick.datetime,
+                datetime=None if compact else tick.datetime,
                 gateway_name=tick.gateway_name,
                 open_price=tick.last_price,
                 high_price=tick.last_price,
@@ -237,6 +324,16 @@ class BarGenerator:
                 close_price=tick.last_price,
                 open_interest=tick.open_interest
             )
+            if compact:
+                self.bar.timestamp = timestamp
+
+            if self.event_engine:
+                if compact:
+                    self.bar_end = (minute + 1) * MINUTE_NS
+                    self.bar_end_time = self.bar_end / 1_000_000_000
+                else:
+                    self.bar_end = tick.datetime.replace(second=0, microsecond=0) + MINUTE
+                    self.bar_end_time = self.bar_end.timestamp()
         else:
             self.bar.high_price = max(self.bar.high_price, tick.last_price)
             if tick.high_price > self.last_tick.high_price:
@@ -248,7 +345,14 @@ class BarGenerator:
 
             self.bar.close_price = tick.last_price
             self.bar.open_interest = tick.open_interest
-            self.bar.datetime = tick.datetime
+            if compact:
+                self.bar.timestamp = timestamp
+            else:
+                self.bar.datetime = tick.datetime
+
+        if compact:
+            self.last_timestamp = timestamp
+            self.bar_minute = minute
 
         if self.last_tick:
             volume_change = tick.volume - self.last_tick.volume
@@ -256,11 +360,195 @@ class BarGenerator:
 
         self.last_tick = tick
 
+        if self.event_engine:
+            if compact:
+                self.data_time = timestamp / 1_000_000_000
+            else:
+                self.data_time = tick.datetime.timestamp()
+            self.data_received = monotonic()
+
+    def update_tick_bar_type(self, tick: TickData) -> None:
+        """
+        Update tick data into second/volume/turnover/tick bar.
+        """
+        # Filter tick data with older timestamp
+        last_tick = self.last_tick
+        if last_tick and tick.datetime < last_tick.datetime:
+            return
+
+        if last_tick:
+            volume_change = max(tick.volume - last_tick.volume, 0)
+        else:
+            volume_change = 0
+
+        # Second bar is finished by tick of next period
+        if self.bar_type == BarType.SECOND:
+            timestamp = tick.datetime.timestamp()
+            second = timestamp // self.bar_size * self.bar_size
+
+            # Filter tick data of bar already closed by timer
+            if self.closed_end and timestamp < self.closed_end:
+                return
+
+            if self.bar and second != self.bar_second:
+                self.on_bar(self.bar)
+                self.bar = None
+
+            self.bar_second = second
+
+        if not self.bar:
+            if self.bar_type == BarType.SECOND:
+                dt = datetime.fromtimestamp(self.bar_second, tick.datetime.tzinfo)
+            else:
+                dt = tick.datetime
+
+            self.bar = get_bar_class(tick)(
+                symbol=tick.symbol,
+                exchange=tick.exchange,
+                datetime=dt,
+                gateway_name=tick.gateway_name,
+                open_price=tick.last_price,
+                high_price=tick.last_price,
+                low_price=tick.last_price,
+                close_price=tick.last_price,
+                open_interest=tick.open_interest
+            )
+            self.bar_ticks = 0
+            self.bar_turnover = 0
+
+            if self.event_engine and self.bar_type == BarType.SECOND:
+                self.bar_end = self.bar_end_time = self.bar_second + self.bar_size
+        else:
+            self.bar.high_price = max(self.bar.high_price, tick.last_price)
+            if tick.high_price > last_tick.high_price:
+                self.bar.high_price = max(self.bar.high_price, tick.high_price)
+
+            self.bar.low_price = min(self.bar.low_price, tick.last_price)
+            if tick.low_price < last_tick.low_price:
+                self.bar.low_price = min(self.bar.low_price, tick.low_price)
+
+            self.bar.close_price = tick.last_price
+            self.bar.open_interest = tick.open_interest
+
+        self.bar.volume += volume_change
+        self.bar_turnover += volume_change * tick.last_price
+        self.bar_ticks += 1
+
+        self.last_tick = tick
+
+        if self.event_engine and self.bar_type == BarType.SECOND:
+            self.data_time = timestamp
+            self.data_received = monotonic()
+
+        # Other bars are finished by tick which reaches bar size
+        if self.bar_type == BarType.VOLUME:
+            finished = self.bar.volume >= self.bar_size
+        elif self.bar_type == BarType.TURNOVER:
+            finished = self.bar_turnover >= self.bar_size
+        elif self.bar_type == BarType.TICK:
+            finished = self.bar_ticks >= self.bar_size
+        else:
+            finished = False
+
+        if finished:
+            self.on_bar(self.bar)
+            self.bar = None
+
+    def start_timer(
+        self,
+        event_engine: EventEngine,
+        grace: float = 0.5,
+        interval: float = 0.1
+    ) -> None:
+        """
+        Close 1 minute bar (or second bar) by timer of event engine, when
+        time of data passes end of bar period plus grace seconds, instead
+        of waiting for the first tick of next period.
+
+        Time of data is estimated by time of last tick plus wall-clock time
+        elapsed since it was received, so bars are closed correctly in
+        history replay and regardless of local clock offset. In
+        backtesting there is no event engine, and timer is not needed.
+
+        Bar is closed by an event with type prefix EVENT_TICK and last
+        tick as data, so that it is processed in the same thread as tick
+        data (e.g. tick lane of ShardedEventEngine).
+
+        Tick data arriving after its bar closed is not used in any bar,
+        and its volume is counted into next bar.
+        """
+        if self.timer_id:
+            return
+
+        self.event_engine = event_engine
+        self.grace = grace
+        self.close_type = f"{EVENT_TICK}close.{id(self)}"
+
+        event_engine.register(self.close_type, self.process_close_event)
+        self.timer_id = event_engine.add_timer(interval, self.process_timer_event)
+
+    def stop_timer(self) -> None:
+        """
+        Stop closing bar by timer.
+        """
+        if self.timer_id:
+            self.event_engine.remove_timer(self.timer_id)
+            self.event_engine.unregister(self.close_type, self.process_close_event)
+            self.timer_id = ""
+
+        self.event_engine = None
+        self.bar_end = None
+        self.close_pending = False
+
+    def process_timer_event(self, event: Event) -> None:
+        """
+        Put close event if current bar is due, only one at a time.
+        """
+        if self.close_pending or not self.is_bar_due():
+            return
+
+        self.close_pending = True
+        self.event_engine.put(Event(self.close_type, self.last_tick))
+
+    def process_close_event(self, event: Event) -> None:
+        """
+        Close current bar if still due, as tick data may arrive after
+        close event put.
+        """
+        self.close_pending = False
+
+        if not self.timer_id or not self.is_bar_due():
+            return
+
+        bar = self.bar
+        if self.bar_type == BarType.TIME:
+            if isinstance(bar, CompactBarData):
+                bar.timestamp = self.bar_minute * MINUTE_NS
+            else:
+                bar.datetime = bar.datetime.replace(second=0, microsecond=0)
+
+        self.bar = None
+        self.closed_end = self.bar_end
+        self.bar_end = None
+        self.on_bar(bar)
+
+    def is_bar_due(self) -> bool:
+        """
+        Check if time of data passes end of current bar plus grace.
+        """
+        if not self.bar or not self.bar_end or not self.data_received:
+            return False
+
+        data_time = self.data_time + monotonic() - self.data_received
+        return data_time >= self.bar_end_time + self.grace
+
     def update_bar(self, bar: BarData) -> None:
         """
         Update 1 minute bar into generator
         """
-        if self.interval == Interval.MINUTE:
+        if self.bar_type != BarType.TIME:
+            self.update_bar_count_window(bar)
+        elif self.interval == Interval.MINUTE:
             self.update_bar_minute_window(bar)
         else:
             self.update_bar_hour_window(bar)
@@ -270,7 +558,7 @@ class BarGenerator:
         # If not inited, create window bar object
         if not self.window_bar:
             dt = bar.datetime.replace(second=0, microsecond=0)
-            self.window_bar = BarData(
+            self.window_bar = get_bar_class(bar)(
                 symbol=bar.symbol,
                 exchange=bar.exchange,
                 datetime=dt,
@@ -308,7 +596,7 @@ class BarGenerator:
         # If not inited, create window bar object
         if not self.hour_bar:
             dt = bar.datetime.replace(minute=0, second=0, microsecond=0)
-            self.hour_bar = BarData(
+            self.hour_bar = get_bar_class(bar)(
                 symbol=bar.symbol,
                 exchange=bar.exchange,
                 datetime=dt,
@@ -345,7 +633,7 @@ class BarGenerator:
             finished_bar = self.hour_bar
 
             dt = bar.datetime.replace(minute=0, second=0, microsecond=0)
-            self.hour_bar = BarData(
+            self.hour_bar = get_bar_class(bar)(
                 symbol=bar.symbol,
                 exchange=bar.exchange,
                 datetime=dt,
@@ -384,7 +672,7 @@ class BarGenerator:
             self.on_window_bar(bar)
         else:
             if not self.window_bar:
-                self.window_bar = BarData(
+                self.window_bar = get_bar_class(bar)(
                     symbol=bar.symbol,
                     exchange=bar.exchange,
                     datetime=bar.datetime,
@@ -413,6 +701,45 @@ class BarGenerator:
                 self.on_window_bar(self.window_bar)
                 self.window_bar = None
 
+    def update_bar_count_window(self, bar: BarData) -> None:
+        """
+        Generate x window bar from every x bars of second/volume/turnover/tick
+        bar type.
+        """
+        if self.window == 1:
+            self.on_window_bar(bar)
+            return
+
+        if not self.window_bar:
+            self.window_bar = get_bar_class(bar)(
+                symbol=bar.symbol,
+                exchange=bar.exchange,
+                datetime=bar.datetime,
+                gateway_name=bar.gateway_name,
+                open_price=bar.open_price,
+                high_price=bar.high_price,
+                low_price=bar.low_price
+            )
+        else:
+            self.window_bar.high_price = max(
+                self.window_bar.high_price,
+                bar.high_price
+            )
+            self.window_bar.low_price = min(
+                self.window_bar.low_price,
+                bar.low_price
+            )
+
+        self.window_bar.close_price = bar.close_price
+        self.window_bar.volume += bar.volume
+        self.window_bar.open_interest = bar.open_interest
+
+        self.interval_count += 1
+        if not self.interval_count % self.window:
+            self.interval_count = 0
+            self.on_window_bar(self.window_bar)
+            self.window_bar = None
+
     def generate(self) -> Optional[BarData]:
         """
         Generate the bar data and call callback immediately.
@@ -420,13 +747,321 @@ class BarGenerator:
         bar = self.bar
 
         if self.bar:
-            bar.datetime = bar.datetime.replace(second=0, microsecond=0)
+            if self.bar_type == BarType.TIME:
+                bar.datetime = bar.datetime.replace(second=0, microsecond=0)
             self.on_bar(bar)
 
         self.bar = None
         return bar
 
 
+TICK_BAR_FIELDS: List[str] = [
+    "last_price",
+    "high_price",
+    "low_price",
+    "volume",
+    "open_interest",
+]
+
+
+def get_columns(objs: list, fields: List[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Get UTC datetime64 array and arrays of fields from data objects.
+    """
+    timestamps = np.array([obj.datetime.timestamp() for obj in objs])
+    dts = np.round(timestamps * 1_000_000).astype("int64").astype("datetime64[us]")
+
+    values = np.array(list(map(attrgetter(*fields), objs)), dtype=float)
+    values = values.reshape(len(objs), len(fields))
+
+    columns = {f: values[:, i] for i, f in enumerate(fields)}
+    return dts, columns
+
+
+def get_local_datetime64(dts: np.ndarray, tz: tzinfo = None) -> np.ndarray:
+    """
+    Convert UTC datetime array into local time of timezone. Offsets are
+    calculated once for each run of datetimes within the same hour.
+    """
+    hours = dts.astype("datetime64[h]")
+
+    changed = np.ones(len(hours), dtype=bool)
+    changed[1:] = hours[1:] != hours[:-1]
+
+    offsets = []
+    for hour in hours[changed].astype("int64").tolist():
+        dt = datetime.fromtimestamp(hour * 3600, tz)
+        if not tz:
+            dt = dt.astimezone()
+        offsets.append(int(dt.utcoffset().total_seconds()) * 1_000_000)
+
+    offsets = np.array(offsets, dtype="int64").astype("timedelta64[us]")
+    return dts + offsets[np.cumsum(changed) - 1]
+
+
+def floor_datetime64(dts: np.ndarray, local_dts: np.ndarray, unit: str) -> np.ndarray:
+    """
+    Floor UTC datetime array to minute or hour by its local time.
+    """
+    return dts - (local_dts - local_dts.astype(f"datetime64[{unit}]"))
+
+
+def aggregate_bars(
+    batch: DataBatch,
+    columns: Dict[str, np.ndarray],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    dts: np.ndarray,
+    interval: Interval
+) -> BarBatch:
+    """
+    Aggregate bar columns within [start, end] of each group into new batch.
+    """
+    data = np.empty(len(starts), dtype=BarBatch.dtype)
+    data["datetime"] = dts
+    data["open_price"] = columns["open_price"][starts]
+    data["close_price"] = columns["close_price"][ends]
+    data["open_interest"] = columns["open_interest"][ends]
+
+    if len(starts):
+        end = ends[-1] + 1
+        data["high_price"] = np.maximum.reduceat(columns["high_price"][:end], starts)
+        data["low_price"] = np.minimum.reduceat(columns["low_price"][:end], starts)
+        data["volume"] = np.add.reduceat(columns["volume"][:end], starts)
+
+    return BarBatch(
+        batch.symbol,
+        batch.exchange,
+        interval,
+        data,
+        batch.gateway_name,
+        batch.tz
+    )
+
+
+def generate_bars_from_ticks(ticks: Union[TickBatch, List[TickData]]) -> BarBatch:
+    """
+    Generate 1 minute bars from ticks in one vectorized pass, with the
+    same rules as BarGenerator.update_tick. Last minute bar is not
+    finished by a tick of next minute, so it's not included.
+    """
+    if isinstance(ticks, TickBatch):
+        batch = ticks
+        dts = ticks["datetime"]
+        columns = {f: ticks[f] for f in TICK_BAR_FIELDS}
+    # Only read fields used from tick objects, instead of a full batch
+    else:
+        tick = ticks[0]
+        batch = TickBatch(
+            tick.symbol,
+            tick.exchange,
+            gateway_name=tick.gateway_name,
+            tz=tick.datetime.tzinfo
+        )
+        dts, columns = get_columns(ticks, TICK_BAR_FIELDS)
+
+    last_price = columns["last_price"]
+
+    # Filter tick data with 0 last price and with older timestamp
+    mask = last_price != 0
+    if len(dts):
+        last_dts = np.maximum.accumulate(np.where(mask, dts, dts.min()))
+        mask[1:] &= dts[1:] >= last_dts[:-1]
+
+    dts = dts[mask]
+    last_price = last_price[mask]
+    high_price = columns["high_price"][mask]
+    low_price = columns["low_price"][mask]
+
+    local_dts = get_local_datetime64(dts, batch.tz)
+
+    # Same as BarGenerator, only hour and minute of tick are compared
+    minutes = local_dts.astype("datetime64[m]").astype("int64") % 1440
+    changed = np.flatnonzero(minutes[1:] != minutes[:-1]) + 1
+
+    starts = np.concatenate(([0], changed))[:len(changed)]
+    ends = changed - 1
+
+    # High/low price of tick is counted only when changed since last tick,
+    # except the first tick of bar
+    highs = last_price.copy()
+    inc = np.zeros(len(dts), dtype=bool)
+    inc[1:] = high_price[1:] > high_price[:-1]
+    inc[starts] = False
+    highs[inc] = np.maximum(highs[inc], high_price[inc])
+
+    lows = last_price.copy()
+    dec = np.zeros(len(dts), dtype=bool)
+    dec[1:] = low_price[1:] < low_price[:-1]
+    dec[starts] = False
+    lows[dec] = np.minimum(lows[dec], low_price[dec])
+
+    # Volume change since last tick is added into bar of current tick
+    volume = np.zeros(len(dts))
+    volume[1:] = np.maximum(np.diff(columns["volume"][mask]), 0)
+
+    columns = {
+        "open_price": last_price,
+        "high_price": highs,
+        "low_price": lows,
+        "close_price": last_price,
+        "volume": volume,
+        "open_interest": columns["open_interest"][mask],
+    }
+
+    return aggregate_bars(
+        batch,
+        columns,
+        starts,
+        ends,
+        floor_datetime64(dts[starts], local_dts[starts], "m"),
+        Interval.MINUTE
+    )
+
+
+def generate_window_bars(
+    bars: Union[BarBatch, List[BarData]],
+    window: int,
+    interval: Interval = Interval.MINUTE
+) -> BarBatch:
+    """
+    Generate x minute or x hour bars from 1 minute bars in one vectorized
+    pass, with the same bucketing rules as BarGenerator.update_bar:
+        * x minute bar is finished by bar of minute which (minute + 1)
+        can be divided by x
+        * hour bar is finished by bar of minute 59, or by the first bar
+        of a new hour
+    Bars not finished yet at the end are not included.
+    """
+    if not isinstance(bars, BarBatch):
+        bars = BarBatch.from_bars(bars)
+
+    dts = bars["datetime"]
+    local_dts = get_local_datetime64(dts, bars.tz)
+
+    # Volume of minute bar is truncated into int when added to window bar
+    columns = {f: bars[f] for f in BAR_FIELDS}
+    columns["volume"] = np.trunc(columns["volume"])
+
+    if interval == Interval.MINUTE:
+        minute = local_dts.astype("datetime64[m]").astype("int64") % 60
+
+        ends = np.flatnonzero((minute + 1) % window == 0)
+        starts = np.concatenate(([0], ends[:-1] + 1))[:len(ends)]
+
+        return aggregate_bars(
+            bars,
+            columns,
+            starts,
+            ends,
+            floor_datetime64(dts[starts], local_dts[starts], "m"),
+            Interval.MINUTE
+        )
+
+    # Same as BarGenerator, only hour of bar is compared
+    hours = local_dts.astype("datetime64[h]").astype("int64") % 24
+    is_59 = local_dts.astype("datetime64[m]").astype("int64") % 60 == 59
+
+    # Bar of minute 59 finishes hour bar, unless it creates a new hour bar
+    # right after last one finished. Only runs of consecutive minute 59
+    # bars depend on each other.
+    finished = np.zeros(len(dts), dtype=bool)
+    for i in np.flatnonzero(is_59).tolist():
+        finished[i] = i > 0 and not finished[i - 1]
+
+    is_start = np.ones(len(dts), dtype=bool)
+    is_start[1:] = finished[:-1] | ((hours[1:] != hours[:-1]) & ~is_59[1:])
+
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:] - 1, len(dts) - 1)
+
+    # The last hour bar is only pushed when finished by minute 59
+    if len(ends) and not finished[ends[-1]]:
+        starts = starts[:-1]
+        ends = ends[:-1]
+
+    # Volume of the first minute bar of hour bar is not truncated
+    columns["volume"][is_start] = bars["volume"][is_start]
+
+    hour_bars = aggregate_bars(
+        bars,
+        columns,
+        starts,
+        ends,
+        floor_datetime64(dts[starts], local_dts[starts], "h"),
+        Interval.HOUR
+    )
+    if window == 1:
+        return hour_bars
+
+    count = len(hour_bars) // window * window
+    starts = np.arange(0, count, window)
+
+    columns = {f: hour_bars[f] for f in BAR_FIELDS}
+    columns["volume"] = np.trunc(columns["volume"])
+
+    return aggregate_bars(
+        hour_bars,
+        columns,
+        starts,
+        starts + window - 1,
+        hour_bars["datetime"][starts],
+        Interval.HOUR
+    )
+
+
+def cached_indicator(func: Callable) -> Callable:
+    """
+    Cache result of ArrayManager indicator method until next bar updated.
+
+    Arrays in result are made read-only, as the same arrays are returned
+    by later calls, copy them before changing in place.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self: "ArrayManager", *args, **kwargs):
+        """"""
+        if not self.cache_size:
+            return func(self, *args, **kwargs)
+
+        key = (name, self.count, args, tuple(kwargs.items()))
+
+        try:
+            result = self.cache[key]
+        except KeyError:
+            self.cache_misses += 1
+        except TypeError:
+            return func(self, *args, **kwargs)
+        else:
+            self.cache_hits += 1
+            return result
+
+        result = func(self, *args, **kwargs)
+
+        if isinstance(result, tuple):
+            for r in result:
+                set_readonly(r)
+        else:
+            set_readonly(result)
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[key] = result
+
+        return result
+
+    return wrapper
+
+
+def set_readonly(value: Any) -> None:
+    """
+    Make numpy array read-only, other values are ignored.
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+
+
 class ArrayManager(object):
     """
     For:
@@ -434,40 +1069,95 @@ class ArrayManager(object):
     2. calculating technical indicator value
     """
 
-    def __init__(self, size: int = 100):
-        """Constructor"""
+    def __init__(self, size: int = 100, cache_size: int = 128):
+        """
+        Indicator results are cached until next bar updated, set
+        cache_size to 0 to disable caching.
+        """
         self.count: int = 0
         self.size: int = size
         self.inited: bool = False
 
-        self.open_array: np.ndarray = np.zeros(size)
-        self.high_array: np.ndarray = np.zeros(size)
-        self.low_array: np.ndarray = np.zeros(size)
-        self.close_array: np.ndarray = np.zeros(size)
-        self.volume_array: np.ndarray = np.zeros(size)
-        self.open_interest_array: np.ndarray = np.zeros(size)
+        self.cache: Dict[tuple, Any] = {}
+        self.cache_size: int = cache_size
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+        # Ring buffer of open, high, low, close, volume and open interest.
+        # Every value is written twice (at index and index + size), so
+        # that latest size values are always a contiguous ordered view.
+        self.buffer: np.ndarray = np.zeros((6, size * 2))
+        self.start: int = 0
+
+        self.indicators: List[Indicator] = []
 
     def update_bar(self, bar: BarData) -> None:
         """
         Update new bar data into array manager.
         """
         self.count += 1
+        if self.cache:
+            self.cache.clear()
         if not self.inited and self.count >= self.size:
             self.inited = True
 
-        self.open_array[:-1] = self.open_array[1:]
-        self.high_array[:-1] = self.high_array[1:]
-        self.low_array[:-1] = self.low_array[1:]
-        self.close_array[:-1] = self.close_array[1:]
-        self.volume_array[:-1] = self.volume_array[1:]
-        self.open_interest_array[:-1] = self.open_interest_array[1:]
+        values = (
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume,
+            bar.open_interest
+        )
+
+        start = self.start
+        self.buffer[:, start] = values
+        self.buffer[:, start + self.size] = values
 
-        self.open_array[-1] = bar.open_price
-        self.high_array[-1] = bar.high_price
-        self.low_array[-1] = bar.low_price
-        self.close_array[-1] = bar.close_price
-        self.volume_array[-1] = bar.volume
-        self.open_interest_array[-1] = bar.open_interest
+        start += 1
+        if start == self.size:
+            start = 0
+        self.start = start
+
+        for indicator in self.indicators:
+            indicator.update_bar(bar)
+
+    def add_indicator(self, indicator: Indicator) -> Indicator:
+        """
+        Attach incremental indicator which is updated with every new bar.
+        """
+        self.indicators.append(indicator)
+        return indicator
+
+    @property
+    def open_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[0, self.start:self.start + self.size]
+
+    @property
+    def high_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[1, self.start:self.start + self.size]
+
+    @property
+    def low_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[2, self.start:self.start + self.size]
+
+    @property
+    def close_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[3, self.start:self.start + self.size]
+
+    @property
+    def volume_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[4, self.start:self.start + self.size]
+
+    @property
+    def open_interest_array(self) -> np.ndarray:
+        """"""
+        return self.buffer[5, self.start:self.start + self.size]
 
     @property
     def open(self) -> np.ndarray:
@@ -511,6 +1201,7 @@ class ArrayManager(object):
         """
         return self.open_interest_array
 
+    @cached_indicator
     def sma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Simple moving average.
@@ -520,6 +1211,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def ema(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Exponential moving average.
@@ -529,6 +1221,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def kama(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         KAMA.
@@ -538,6 +1231,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def wma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         WMA.
@@ -547,6 +1241,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def apo(
         self,
         fast_period: int,
@@ -562,6 +1257,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def cmo(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         CMO.
@@ -571,6 +1267,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def mom(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MOM.
@@ -580,6 +1277,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def ppo(
         self,
         fast_period: int,
@@ -595,6 +1293,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def roc(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROC.
@@ -604,6 +1303,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def rocr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCR.
@@ -613,6 +1313,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def rocp(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCP.
@@ -622,6 +1323,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def rocr_100(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ROCR100.
@@ -631,6 +1333,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def trix(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         TRIX.
@@ -640,6 +1343,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def std(self, n: int, nbdev: int = 1, array: bool = False) -> Union[float, np.ndarray]:
         """
         Standard deviation.
@@ -649,6 +1353,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def obv(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         OBV.
@@ -658,6 +1363,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def cci(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Commodity Channel Index (CCI).
@@ -667,6 +1373,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def atr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Average True Range (ATR).
@@ -676,6 +1383,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def natr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         NATR.
@@ -685,6 +1393,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def rsi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Relative Strenght Index (RSI).
@@ -694,6 +1403,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def macd(
         self,
         fast_period: int,
@@ -714,6 +1424,7 @@ class ArrayManager(object):
             return macd, signal, hist
         return macd[-1], signal[-1], hist[-1]
 
+    @cached_indicator
     def adx(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ADX.
@@ -723,6 +1434,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def adxr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         ADXR.
@@ -732,6 +1444,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def dx(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         DX.
@@ -741,6 +1454,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def minus_di(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MINUS_DI.
@@ -750,6 +1464,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def plus_di(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         PLUS_DI.
@@ -759,6 +1474,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def willr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         WILLR.
@@ -768,6 +1484,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def ultosc(
         self,
         time_period1: int = 7,
@@ -783,6 +1500,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def trange(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         TRANGE.
@@ -792,6 +1510,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def boll(
         self,
         n: int,
@@ -812,6 +1531,7 @@ class ArrayManager(object):
 
         return up, down
 
+    @cached_indicator
     def keltner(
         self,
         n: int,
@@ -832,6 +1552,7 @@ class ArrayManager(object):
 
         return up, down
 
+    @cached_indicator
     def donchian(
         self, n: int, array: bool = False
     ) -> Union[
@@ -848,6 +1569,7 @@ class ArrayManager(object):
             return up, down
         return up[-1], down[-1]
 
+    @cached_indicator
     def aroon(
         self,
         n: int,
@@ -865,6 +1587,7 @@ class ArrayManager(object):
             return aroon_up, aroon_down
         return aroon_up[-1], aroon_down[-1]
 
+    @cached_indicator
     def aroonosc(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Aroon Oscillator.
@@ -875,6 +1598,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def minus_dm(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         MINUS_DM.
@@ -885,6 +1609,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def plus_dm(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         PLUS_DM.
@@ -895,6 +1620,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def mfi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
         """
         Money Flow Index.
@@ -904,6 +1630,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def ad(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         AD.
@@ -913,6 +1640,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def adosc(
         self,
         fast_period: int,
@@ -927,6 +1655,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @cached_indicator
     def bop(self, array: bool = False) -> Union[float, np.ndarray]:
         """
         BOP.
@@ -938,6 +1667,225 @@ class ArrayManager(object):
         return result[-1]
 
 
+class PortfolioArrayManager(object):
+    """
+    For:
+    1. time series container of bar data of multiple symbols, stored
+    in 2-D arrays of (symbol, time)
+    2. calculating indicator values of all symbols at once
+    """
+
+    def __init__(self, vt_symbols: List[str], size: int = 100):
+        """Constructor"""
+        self.vt_symbols: List[str] = list(vt_symbols)
+        self.indexes: Dict[str, int] = {
+            vt_symbol: i for i, vt_symbol in enumerate(self.vt_symbols)
+        }
+
+        self.count: int = 0
+        self.size: int = size
+        self.inited: bool = False
+
+        # Mirrored ring buffer along time axis, same as ArrayManager
+        self.buffer: np.ndarray = np.zeros((6, len(self.vt_symbols), size * 2))
+        self.start: int = 0
+
+    def update_bars(self, bars: Dict[str, BarData]) -> None:
+        """
+        Update new bars of all symbols. For symbol without new bar, last
+        close price is used as price with zero volume.
+        """
+        self.count += 1
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        last = self.start + self.size - 1
+        close = self.buffer[3, :, last]
+
+        values = np.empty((6, len(self.vt_symbols)))
+        values[:4] = close
+        values[4] = 0
+        values[5] = self.buffer[5, :, last]
+
+        indexes = self.indexes
+        for vt_symbol, bar in bars.items():
+            i = indexes.get(vt_symbol, None)
+            if i is None:
+                continue
+
+            values[:, i] = (
+                bar.open_price,
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+                bar.volume,
+                bar.open_interest
+            )
+
+        start = self.start
+        self.buffer[:, :, start] = values
+        self.buffer[:, :, start + self.size] = values
+
+        start += 1
+        if start == self.size:
+            start = 0
+        self.start = start
+
+    def get_index(self, vt_symbol: str) -> int:
+        """
+        Get row index of symbol in arrays.
+        """
+        return self.indexes[vt_symbol]
+
+    @property
+    def open(self) -> np.ndarray:
+        """
+        Get open price time series of all symbols.
+        """
+        return self.buffer[0, :, self.start:self.start + self.size]
+
+    @property
+    def high(self) -> np.ndarray:
+        """
+        Get high price time series of all symbols.
+        """
+        return self.buffer[1, :, self.start:self.start + self.size]
+
+    @property
+    def low(self) -> np.ndarray:
+        """
+        Get low price time series of all symbols.
+        """
+        return self.buffer[2, :, self.start:self.start + self.size]
+
+    @property
+    def close(self) -> np.ndarray:
+        """
+        Get close price time series of all symbols.
+        """
+        return self.buffer[3, :, self.start:self.start + self.size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        """
+        Get trading volume time series of all symbols.
+        """
+        return self.buffer[4, :, self.start:self.start + self.size]
+
+    @property
+    def open_interest(self) -> np.ndarray:
+        """
+        Get open interest time series of all symbols.
+        """
+        return self.buffer[5, :, self.start:self.start + self.size]
+
+    def sma(self, n: int, array: bool = False) -> np.ndarray:
+        """
+        Simple moving average of all symbols.
+        """
+        close = self.close
+
+        if not array:
+            return close[:, -n:].mean(axis=1)
+
+        total = np.cumsum(close, axis=1)
+        total[:, n:] = total[:, n:] - total[:, :-n]
+
+        result = total / n
+        result[:, :n - 1] = np.nan
+        return result
+
+    def ema(self, n: int, array: bool = False) -> np.ndarray:
+        """
+        Exponential moving average of all symbols, seeded with SMA of
+        first n values in window same as talib.
+        """
+        close = self.close
+        k = 2 / (n + 1)
+
+        result = np.full(close.shape, np.nan)
+        value = close[:, :n].mean(axis=1)
+        result[:, n - 1] = value
+
+        for i in range(n, self.size):
+            value = value + (close[:, i] - value) * k
+            result[:, i] = value
+
+        if array:
+            return result
+        return result[:, -1]
+
+    def std(self, n: int, array: bool = False) -> np.ndarray:
+        """
+        Population standard deviation of all symbols.
+        """
+        close = self.close
+
+        if not array:
+            return close[:, -n:].std(axis=1)
+
+        windows = np.lib.stride_tricks.sliding_window_view(close, n, axis=1)
+
+        result = np.full(close.shape, np.nan)
+        result[:, n - 1:] = windows.std(axis=2)
+        return result
+
+    def returns(self, n: int = 1, array: bool = False) -> np.ndarray:
+        """
+        Rate of change of close price in n bars of all symbols.
+        """
+        close = self.close
+
+        if not array:
+            return close[:, -1] / close[:, -1 - n] - 1
+
+        result = np.full(close.shape, np.nan)
+        result[:, n:] = close[:, n:] / close[:, :-n] - 1
+        return result
+
+    def rank(self, data: np.ndarray) -> np.ndarray:
+        """
+        Cross-sectional percentile rank (0 to 1) of data by symbols,
+        which is the first axis. Nan values are kept as nan.
+        """
+        data = np.asarray(data, dtype=float)
+        mask = np.isnan(data)
+
+        # Nan are sorted to the end, so ranks of valid values are not affected
+        ranks = data.argsort(axis=0).argsort(axis=0).astype(float)
+
+        valid = (~mask).sum(axis=0) - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.where(valid > 0, ranks / valid, 0.5)
+
+        result[mask] = np.nan
+        return result
+
+    def zscore(self, data: np.ndarray) -> np.ndarray:
+        """
+        Cross-sectional z-score of data by symbols, which is the first
+        axis. Nan values are ignored.
+        """
+        data = np.asarray(data, dtype=float)
+
+        # Suppress warnings of columns with all nan or same values
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            mean = np.nanmean(data, axis=0)
+            std = np.nanstd(data, axis=0)
+            result = (data - mean) / std
+
+        result[..., std == 0] = 0
+        return result
+
+    def to_dict(self, data: np.ndarray) -> Dict[str, Any]:
+        """
+        Convert result of all symbols into dict by vt_symbol.
+        """
+        return dict(zip(self.vt_symbols, data))
+
+
 def virtual(func: Callable) -> Callable:
     """
     mark a function as "virtual", which means that this function can be override.